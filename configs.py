@@ -196,6 +196,12 @@ class ServerSettings(BaseSettings):
         description="Keep alive timeout in seconds"
     )
     
+    max_concurrent_chats: int = Field(
+        default=32,
+        env="MAX_CONCURRENT_CHATS",
+        description="Maximum agent runs streaming at once per worker process"
+    )
+    
     # CORS settings
     cors_origins: list[str] = Field(
         default=["*"],
@@ -1,13 +1,15 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
-from src.api.routers.chat import router as chat_router
+from src.api.routers.chat import router as chat_router, image_http_client, build_memory_service
+from google.adk.memory import InMemoryMemoryService
 from src.api.routers.agents import agents_router
 from src.api.routers.session import router as session_router
 from src.api.routers.auth import router as auth_router
 from src.api.routers.epics import router as epics_router
 from src.api.routers.members import router as members_router
-# Removed database import since we're using direct connections
+from src.database.postgres import get_pool, close_pool
 
 from contextlib import asynccontextmanager
 from configs import get_settings, get_server_settings
@@ -19,11 +21,18 @@ server_settings = get_server_settings()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print(f"Starting {server_settings.app_name}...")
-    print("Using direct database connections (no pool)")
+    # Open the shared asyncpg pool up front instead of on the first request
+    await get_pool()
+    print("Database pool ready")
+    # Memory services are request-independent; build them once per process
+    app.state.memory_service = build_memory_service()
+    app.state.inmemory_memory_service = InMemoryMemoryService()
     yield
     
     print(f"Shutting down {server_settings.app_name}...")
-    print("No database pool to disconnect")
+    await image_http_client.aclose()
+    await close_pool()
+    print("Database pool closed")
 
 app = FastAPI(
     title=server_settings.app_name,
@@ -32,7 +41,8 @@ app = FastAPI(
     docs_url=server_settings.docs_url,
     redoc_url=server_settings.redoc_url,
     root_path="",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
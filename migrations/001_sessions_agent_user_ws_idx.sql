@@ -0,0 +1,12 @@
+-- Index for GET /api/v1/agents/{agent_id}/sessions.
+-- Matches the app_name/user_id/workspace/agent filter and the create_time
+-- ordering, so Postgres can read sessions in order without a sort.
+-- CONCURRENTLY cannot run inside a transaction block; run with autocommit.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS sessions_agent_user_ws_idx
+    ON sessions (
+        app_name,
+        user_id,
+        (state->>'workspace_id'),
+        (state->>'agent_id'),
+        create_time DESC
+    );
@@ -0,0 +1,14 @@
+-- Index for GET /api/v1/sessions/{session_id}/events.
+-- Matches the session_id/user_id/app_name filter and the timestamp DESC
+-- ordering, so Postgres reads the newest 50 events from the index
+-- instead of sorting every event of the session.
+-- The session ownership check is already served by the sessions
+-- primary key (app_name, user_id, id), so no extra sessions index.
+-- CONCURRENTLY cannot run inside a transaction block; run with autocommit.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS events_session_user_app_ts_idx
+    ON events (
+        session_id,
+        user_id,
+        app_name,
+        timestamp DESC
+    );
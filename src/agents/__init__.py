@@ -4,4 +4,7 @@ from src.agents.project_manager_agent.agent import project_manager_agent
 AGENT_MAPPING = {
     "facebook_marketing_agent": facebook_marketing_agent,
     "project_manager_agent": project_manager_agent,
-}
\ No newline at end of file
+}
+
+# agent_id -> (agent, agent.name), so hot paths skip the attribute lookup
+AGENT_INFO = {agent_id: (agent, agent.name) for agent_id, agent in AGENT_MAPPING.items()}
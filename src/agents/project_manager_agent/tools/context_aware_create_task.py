@@ -54,18 +54,18 @@ def context_aware_create_task_tool(
     user_id = None
     user_name = None
     
-    # Method 1: Try to get from thread-local storage or global context
-    # This would be set by the agent runner when executing tools
+    # Method 1: Try to get from the per-request agent context
+    # This is set by the chat endpoints before running the agent
     try:
-        import threading
-        context = getattr(threading.current_thread(), 'agent_context', None)
+        from src.utils.agent_context import AGENT_CONTEXT
+        context = AGENT_CONTEXT.get()
         if context:
             workspace_id = context.get('workspace_id')
             user_id = context.get('user_id')
             user_name = context.get('user_name')
-            logger.info(f"Got context from thread: workspace_id={workspace_id}, user_id={user_id}")
+            logger.info(f"Got context from agent context: workspace_id={workspace_id}, user_id={user_id}")
     except Exception as e:
-        logger.debug(f"Could not get context from thread: {e}")
+        logger.debug(f"Could not get agent context: {e}")
     
     # Method 2: Try to get from environment variables (fallback for testing)
     if not workspace_id or not user_id or not user_name:
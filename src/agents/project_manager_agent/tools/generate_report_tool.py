@@ -5,12 +5,12 @@ Comprehensive reporting with time-based filtering, assignee breakdowns, and aler
 
 from typing import Dict, Any, Optional, List
 import logging
-import threading
 import asyncio
 import concurrent.futures
 from datetime import datetime, timedelta
 from src.api.services.epic_service import EpicService
 from src.api.logging.logger import get_logger
+from src.utils.agent_context import AGENT_CONTEXT
 
 logger = get_logger(__name__)
 
@@ -41,21 +41,21 @@ def generate_report_tool(
     logger.info(f"Parameters: time_period={time_period}, scope={scope}, assignee_breakdown={include_assignee_breakdown}")
     
     try:
-        # 1. Get context from thread-local storage
+        # 1. Get context from the per-request agent context
         context = None
         workspace_id = None
         user_id = None
         user_name = None
         
         try:
-            context = getattr(threading.current_thread(), 'agent_context', None)
+            context = AGENT_CONTEXT.get()
             if context:
                 workspace_id = context.get('workspace_id')
                 user_id = context.get('user_id')
                 user_name = context.get('user_name')
                 logger.info(f"Got context: workspace_id={workspace_id}, user_id={user_id}")
             else:
-                logger.warning("No agent context found in thread")
+                logger.warning("No agent context found")
         except Exception as e:
             logger.error(f"Error getting context: {e}")
         
@@ -6,10 +6,10 @@ Update Epic, Task, or Sub_task by ID
 from typing import Dict, Any, Optional
 import logging
 from src.api.services.epic_service import EpicService
-import threading
 import asyncio
 import concurrent.futures
 from src.api.logging.logger import get_logger
+from src.utils.agent_context import AGENT_CONTEXT
 
 logger = get_logger(__name__)
 
@@ -52,20 +52,19 @@ async def update_task_tool(
     logger.info(f"Updating item: {item_id}")
     
     try:
-        # 1. Get context from thread-local storage
-        import threading
+        # 1. Get context from the per-request agent context
         context = None
         workspace_id = None
         user_id = None
         
         try:
-            context = getattr(threading.current_thread(), 'agent_context', None)
+            context = AGENT_CONTEXT.get()
             if context:
                 workspace_id = context.get('workspace_id')
                 user_id = context.get('user_id')
                 logger.info(f"Got context: workspace_id={workspace_id}, user_id={user_id}")
             else:
-                logger.warning("No agent context found in thread")
+                logger.warning("No agent context found")
         except Exception as e:
             logger.error(f"Error getting context: {e}")
         
@@ -0,0 +1,32 @@
+from dataclasses import dataclass
+from typing import Tuple
+import os
+from dotenv import load_dotenv
+
+# Load environment variables trước khi đọc cấu hình JWT
+load_dotenv()
+
+@dataclass(frozen=True)
+class _JWTConfig:
+    """Cấu hình JWT dùng chung cho auth router và dependencies (đọc một lần khi import)"""
+    secret_key: str
+    algorithm: str
+    expire_minutes: int
+
+    @property
+    def secret_bytes(self) -> bytes:
+        return self.secret_key.encode("utf-8")
+
+    @property
+    def algorithms_tuple(self) -> Tuple[str, ...]:
+        return (self.algorithm,)
+
+    @property
+    def expire_seconds(self) -> int:
+        return self.expire_minutes * 60
+
+JWT_CONFIG = _JWTConfig(
+    secret_key=os.getenv("JWT_SECRET_KEY", "ai-proma-secret-key-2024"),
+    algorithm="HS256",
+    expire_minutes=int(os.getenv("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", "480"))  # 8 hours
+)
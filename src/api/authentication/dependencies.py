@@ -1,19 +1,48 @@
 from fastapi import HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, NamedTuple
 import jwt
+import orjson
+import hashlib
 import logging
-import os
+import time
+from cachetools import TLRUCache
+from src.api.authentication._config import JWT_CONFIG
 
 logger = logging.getLogger(__name__)
 
-# Sử dụng cùng secret key với auth router
-SECRET_KEY = os.getenv("JWT_SECRET_KEY", "ai-proma-secret-key-2024")
-ALGORITHM = "HS256"
-
 security = HTTPBearer()
 
+class _ORJSONPyJWT(jwt.PyJWT):
+    """PyJWT decoder dùng orjson để parse payload (nhanh hơn json stdlib)"""
+
+    def _decode_payload(self, decoded: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            payload = orjson.loads(decoded["payload"])
+        except (ValueError, RecursionError) as e:
+            raise jwt.DecodeError(f"Invalid payload string: {e}") from e
+        if not isinstance(payload, dict):
+            raise jwt.DecodeError("Invalid payload string: must be a json object")
+        return payload
+
+jwt_decoder = _ORJSONPyJWT()
+
+# Token đã verify gần đây: value = (kết quả, exp). Mỗi entry sống tối đa 60s
+# và không bao giờ quá exp của token, nên token hết hạn không được cache cứu
+_TOKEN_CACHE_TTL = 60
+
+def _token_ttu(_key, value, now):
+    exp = value[1]
+    return min(now + _TOKEN_CACHE_TTL, exp) if exp is not None else now + _TOKEN_CACHE_TTL
+
+_epic_context_cache = TLRUCache(maxsize=10_000, ttu=_token_ttu, timer=time.time)
+_current_user_cache = TLRUCache(maxsize=1024, ttu=_token_ttu, timer=time.time)
+
+def _token_cache_key(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
 def decode_simple_jwt(token: str) -> dict:
     """Decode JWT token đơn giản chỉ lấy thông tin cần thiết
     
@@ -28,7 +57,7 @@ def decode_simple_jwt(token: str) -> dict:
         dict: The decoded JWT payload
     """
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt_decoder.decode(token, JWT_CONFIG.secret_key, algorithms=JWT_CONFIG.algorithms_tuple)
         
         # Kiểm tra các field bắt buộc
         required_fields = ["sub", "user_id", "agent_id", "workspace_id"]
@@ -57,6 +86,10 @@ def decode_simple_jwt(token: str) -> dict:
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Decode JWT token và trả về thông tin user đơn giản"""
     token = credentials.credentials
+    cache_key = _token_cache_key(token)
+    cached = _current_user_cache.get(cache_key)
+    if cached is not None:
+        return cached[0]
     
     # Decode JWT token đơn giản
     token_data = decode_simple_jwt(token)
@@ -73,50 +106,63 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     # Log authentication
     logger.info(f"User authenticated: {user['username']}")
     
-    return {
+    current_user = {
         "user": user,
         "token_data": token_data
     }
+    _current_user_cache[cache_key] = (current_user, token_data.get("exp"))
+    return current_user
+
+class EpicCtx(NamedTuple):
+    """Thông tin định danh cho epic endpoints, bất biến nên có thể cache dùng chung"""
+    workspace_id: str
+    user_id: str
+    user_name: str
 
-async def get_epic_context(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def get_epic_context(credentials: HTTPAuthorizationCredentials = Depends(security)) -> EpicCtx:
     """Decode JWT và chỉ lấy thông tin cần thiết cho epic: workspace_id, user_id, user_name"""
     token = credentials.credentials
+    cache_key = _token_cache_key(token)
+    cached = _epic_context_cache.get(cache_key)
+    if cached is not None:
+        return cached[0]
     
     try:
         # Decode JWT token
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt_decoder.decode(token, JWT_CONFIG.secret_key, algorithms=JWT_CONFIG.algorithms_tuple)
         
         # Chỉ lấy thông tin cần thiết, bỏ qua thông tin thừa
-        epic_context = {
-            "workspace_id": payload.get("workspace_id"),
-            "user_id": payload.get("user_id"), 
-            "user_name": payload.get("username") or payload.get("sub")
-        }
+        epic_context = EpicCtx(
+            workspace_id=payload.get("workspace_id"),
+            user_id=payload.get("user_id"),
+            user_name=payload.get("username") or payload.get("sub")
+        )
         
         # Validation các field bắt buộc
-        if not epic_context["workspace_id"]:
+        if not epic_context.workspace_id:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="workspace_id not found in token",
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        if not epic_context["user_id"]:
+        if not epic_context.user_id:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="user_id not found in token", 
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        if not epic_context["user_name"]:
+        if not epic_context.user_name:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="user_name not found in token",
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        logger.info(f"Epic context extracted: workspace_id={epic_context['workspace_id']}, user_id={epic_context['user_id']}, user_name={epic_context['user_name']}")
+        logger.info(f"Epic context extracted: workspace_id={epic_context.workspace_id}, user_id={epic_context.user_id}, user_name={epic_context.user_name}")
         
+        _epic_context_cache[cache_key] = (epic_context, payload.get("exp"))
         return epic_context
         
     except jwt.ExpiredSignatureError:
@@ -140,6 +186,41 @@ async def get_current_active_user(current_user: dict = Depends(get_current_user)
     """
     return current_user
 
+@dataclass(frozen=True)
+class AuthContext:
+    """Thông tin định danh đã validate từ JWT cho các chat/session/member endpoint"""
+    user_id: str
+    workspace_id: str
+    agent_id: Optional[str]
+    user_name: str
+
+async def get_auth_context(current_user: dict = Depends(get_current_active_user)) -> AuthContext:
+    """Lấy user_id, workspace_id, agent_id, user_name từ token, raise 401 một lần tại đây nếu thiếu"""
+    token_data = current_user.get("token_data", {})
+
+    user_id = token_data.get("user_id") or current_user["user"].get("id")
+    if not user_id:
+        logger.error("User ID not found in token")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User ID not found in token"
+        )
+
+    workspace_id = token_data.get("workspace_id")
+    if not workspace_id:
+        logger.error("Workspace ID not found in token")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Workspace ID not found in token"
+        )
+
+    return AuthContext(
+        user_id=user_id,
+        workspace_id=workspace_id,
+        agent_id=token_data.get("agent_id"),
+        user_name=token_data.get("user_name") or f"User_{user_id}"
+    )
+
 async def get_admin_user(current_user: dict = Depends(get_current_active_user)):
     """Get current user if they are an admin."""
     # Check token data for admin role
@@ -1,12 +1,19 @@
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 from datetime import datetime
 import os
 from typing import Optional
+from configs import get_logging_settings
 
 class ProjectLogger:
     """
     Singleton logger configuration for console output only
+
+    Records are handed to a QueueHandler and written to stdout by a
+    background QueueListener, so request handlers never block on console I/O.
     """
     _instance = None
     _initialized = False
@@ -25,7 +32,8 @@ class ProjectLogger:
         """Setup the main project logger for console only"""
         # Configure root logger
         self.logger = logging.getLogger("MyProject")
-        self.logger.setLevel(logging.DEBUG)
+        # Level from LOG_LEVEL (default INFO); debug records are dropped before formatting
+        self.logger.setLevel(getattr(logging, get_logging_settings().log_level.upper(), logging.INFO))
         
         # Clear existing handlers
         self.logger.handlers.clear()
@@ -40,11 +48,17 @@ class ProjectLogger:
         self._setup_console_handler()
     
     def _setup_console_handler(self):
-        """Setup console logging"""
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setFormatter(self.console_formatter)
-        console_handler.setLevel(logging.DEBUG)  # Show all levels in console
-        self.logger.addHandler(console_handler)
+        """Setup console logging behind a queue"""
+        self.console_handler = logging.StreamHandler(sys.stdout)
+        self.console_handler.setFormatter(self.console_formatter)
+        self.console_handler.setLevel(logging.DEBUG)  # Show all levels in console
+        
+        log_queue = queue.SimpleQueue()
+        self.logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        self.listener = logging.handlers.QueueListener(log_queue, self.console_handler, respect_handler_level=True)
+        self.listener.start()
+        # Flush queued records on interpreter exit
+        atexit.register(self.listener.stop)
     
     def get_logger(self, name: str = None):
         """Get a logger instance for a specific module"""
@@ -56,9 +70,7 @@ class ProjectLogger:
         """Set logging level for the entire project"""
         self.logger.setLevel(getattr(logging, level.upper()))
         # Also update the console handler level
-        for handler in self.logger.handlers:
-            if isinstance(handler, logging.StreamHandler):
-                handler.setLevel(getattr(logging, level.upper()))
+        self.console_handler.setLevel(getattr(logging, level.upper()))
     
     def log_startup_info(self):
         """Log application startup information"""
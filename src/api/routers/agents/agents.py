@@ -1,9 +1,11 @@
-from fastapi import APIRouter, HTTPException, Depends, Path
+from fastapi import APIRouter, HTTPException, Depends, Path, Response
 from src.agents import AGENT_MAPPING
 from src.api.authentication.dependencies import get_current_active_user
 from src.api.schemas.agents import AgentListResponse, AgentDetailResponse, AgentSummary, AgentDetail
 from src.api.logging.logger import get_logger
+from src.database.postgres import get_pool
 from typing import Dict, Any
+import functools
 
 from src.api.schemas.sessions import GetAgentSessionsResponse, SessionSummary
 
@@ -49,6 +51,47 @@ def extract_agent_info(agent_id: str, agent_obj) -> Dict[str, Any]:
             "model_config": {}
         }
 
+@functools.cache
+def _get_all_agent_infos() -> Dict[str, Dict[str, Any]]:
+    """Extract info for every registered agent once; agents don't change at runtime"""
+    return {agent_id: extract_agent_info(agent_id, agent_obj) for agent_id, agent_obj in AGENT_MAPPING.items()}
+
+@functools.cache
+def _get_agent_list_response() -> AgentListResponse:
+    """Pre-built response for /alls"""
+    agents = [
+        AgentSummary(
+            id=agent_info["id"],
+            name=agent_info["name"],
+            description=agent_info["description"]
+        )
+        for agent_info in _get_all_agent_infos().values()
+    ]
+    return AgentListResponse(
+        agents=agents,
+        total_count=len(agents)
+    )
+
+@functools.cache
+def _get_agent_list_json() -> bytes:
+    """Serialized /alls body, encoded once so requests skip validation and JSON encoding"""
+    return _get_agent_list_response().model_dump_json().encode()
+
+@functools.cache
+def _get_agent_detail_responses() -> Dict[str, AgentDetailResponse]:
+    """Pre-built responses for /detail/{agent_id}, keyed by agent ID"""
+    return {
+        agent_id: AgentDetailResponse(agent=AgentDetail(
+            id=agent_info["id"],
+            name=agent_info["name"],
+            description=agent_info["description"],
+            instruction=agent_info["instruction"],
+            tools=agent_info["tools"],
+            model_config=agent_info["model_config"]
+        ))
+        for agent_id, agent_info in _get_all_agent_infos().items()
+    }
+
 @router.get("/alls", response_model=AgentListResponse)
 async def get_agents():
     """
@@ -60,20 +103,10 @@ async def get_agents():
     try:
         logger.info("Fetching list of available agents")
         
-        agents = []
-        for agent_id, agent_obj in AGENT_MAPPING.items():
-            agent_info = extract_agent_info(agent_id, agent_obj)
-            agents.append(AgentSummary(
-                id=agent_info["id"],
-                name=agent_info["name"],
-                description=agent_info["description"]
-            ))
+        content = _get_agent_list_json()
             
-        logger.info(f"Successfully retrieved {len(agents)} agents")
-        return AgentListResponse(
-            agents=agents,
-            total_count=len(agents)
-        )
+        logger.info(f"Successfully retrieved {_get_agent_list_response().total_count} agents")
+        return Response(content=content, media_type="application/json")
         
     except Exception as e:
         logger.error(f"Error fetching agents: {str(e)}")
@@ -93,24 +126,13 @@ async def get_agent_detail(agent_id: str):
     try:
         logger.info(f"Fetching details for agent: {agent_id}")
         
-        if agent_id not in AGENT_MAPPING:
+        agent_detail_response = _get_agent_detail_responses().get(agent_id)
+        if agent_detail_response is None:
             logger.warning(f"Agent not found: {agent_id}")
             raise HTTPException(status_code=404, detail=f"Agent with ID '{agent_id}' not found")
-            
-        agent_obj = AGENT_MAPPING[agent_id]
-        agent_info = extract_agent_info(agent_id, agent_obj)
-        
-        agent_detail = AgentDetail(
-            id=agent_info["id"],
-            name=agent_info["name"],
-            description=agent_info["description"],
-            instruction=agent_info["instruction"],
-            tools=agent_info["tools"],
-            model_config=agent_info["model_config"]
-        )
         
         logger.info(f"Successfully retrieved details for agent: {agent_id}")
-        return AgentDetailResponse(agent=agent_detail)
+        return agent_detail_response
         
     except HTTPException:
         # Re-raise HTTP exceptions
@@ -144,58 +166,27 @@ async def get_agent_sessions(
         raise HTTPException(status_code=404, detail=f"Agent {agent_id} not found")
 
     try:
-        # Import database config and create connection inside function
-        from src.database.postgres import DATABASE_URL
-        import asyncpg
-        
-        # Use direct DB query to get sessions for this agent
-        conn = await asyncpg.connect(DATABASE_URL)
-        try:
+        # Use pooled DB connection to get sessions for this agent
+        pool = await get_pool()
+        async with pool.acquire() as conn:
             # Get sessions with state filter
             sessions_query = """
-                SELECT id, app_name, user_id, create_time, update_time, state
+                SELECT id, app_name, user_id, create_time, update_time
                 FROM sessions 
                 WHERE app_name = $1 
                 AND user_id = $2
-                AND state->>'user_id' = $3
-                AND state->>'workspace_id' = $4
-                AND state->>'agent_id' = $5
+                AND state->>'workspace_id' = $3
+                AND state->>'agent_id' = $4
                 ORDER BY create_time DESC
             """
-            sessions = await conn.fetch(sessions_query, agent_id, user_id, user_id, workspace_id, agent_id)
-        finally:
-            await conn.close()
+            sessions = await conn.fetch(sessions_query, agent_id, user_id, workspace_id, agent_id)
         
-        session_summaries = []
-        for session in sessions:
-            # Handle create_time and update_time conversion
-            create_time_str = None
-            if session["create_time"]:
-                create_time_obj = session["create_time"]
-                if hasattr(create_time_obj, 'isoformat'):
-                    create_time_str = create_time_obj.isoformat()
-                else:
-                    create_time_str = str(create_time_obj)
-            
-            update_time_str = None
-            if session["update_time"]:
-                update_time_obj = session["update_time"]
-                if hasattr(update_time_obj, 'isoformat'):
-                    update_time_str = update_time_obj.isoformat()
-                else:
-                    update_time_str = str(update_time_obj)
-            
-            session_summaries.append(SessionSummary(
-                id=session["id"],
-                app_name=session["app_name"],
-                user_id=session["user_id"],
-                create_time=create_time_str,
-                update_time=update_time_str
-            ))
+        # Query select đúng các field của SessionSummary
+        session_summaries = [SessionSummary.from_trusted(dict(session)) for session in sessions]
         
         logger.info(f"Successfully retrieved {len(session_summaries)} sessions for agent '{agent_id}', user '{user_id}' and workspace '{workspace_id}'")
         
-        return GetAgentSessionsResponse(
+        return GetAgentSessionsResponse.model_construct(
             agent_id=agent_id,
             sessions=session_summaries,
             total_count=len(session_summaries)
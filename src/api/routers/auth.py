@@ -1,21 +1,34 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Response, status
 from pydantic import BaseModel
-from datetime import datetime, timedelta
+from datetime import datetime
 import jwt
+import orjson
 from typing import Optional
-import os
+import time
 import hashlib
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
+import hmac
+import base64
+from src.api.authentication._config import JWT_CONFIG
+from src.api.authentication.dependencies import jwt_decoder
 
 router = APIRouter(prefix="/api/v1/auth", tags=["Authentication"])
 
-# Configuration
-SECRET_KEY = os.getenv("JWT_SECRET_KEY", "ai-proma-secret-key-2024")
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", "480"))  # 8 hours
+# JWT header cố định cho HS256, encode sẵn một lần
+_SECRET_KEY_BYTES = JWT_CONFIG.secret_bytes
+_SIGNING_HEADER = base64.urlsafe_b64encode(b'{"alg":"HS256","typ":"JWT"}').rstrip(b"=")
+# HMAC đã nạp key (ipad/opad); mỗi lần ký chỉ cần .copy()
+_HMAC_TEMPLATE = hmac.HMAC(_SECRET_KEY_BYTES, digestmod=hashlib.sha256)
+
+def _b64url_encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+def create_access_token(payload: dict) -> str:
+    """Ký JWT HS256 trực tiếp (header dựng sẵn + orjson + HMAC-SHA256), tương thích jwt.decode"""
+    signing_input = _SIGNING_HEADER + b"." + _b64url_encode(orjson.dumps(payload))
+    h = _HMAC_TEMPLATE.copy()
+    h.update(signing_input)
+    signature = h.digest()
+    return (signing_input + b"." + _b64url_encode(signature)).decode("ascii")
 
 class TokenResponse(BaseModel):
     access_token: str
@@ -32,18 +45,19 @@ async def create_token_from_any_json(request: dict):
     try:
         # Thêm thông tin expiration vào payload
         payload = request.copy()
+        now = int(time.time())
         payload.update({
-            "iat": datetime.utcnow(),
-            "exp": datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+            "iat": now,
+            "exp": now + JWT_CONFIG.expire_seconds
         })
         
         # Tạo JWT từ payload
-        access_token = jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+        access_token = create_access_token(payload)
         
         return TokenResponse(
             access_token=access_token,
             token_type="bearer",
-            expires_in=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+            expires_in=JWT_CONFIG.expire_seconds,
             claims=request  # Trả về body gốc làm claims
         )
         
@@ -59,7 +73,7 @@ async def decode_token(token: str):
     Decode JWT token để xem thông tin bên trong
     """
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt_decoder.decode(token, JWT_CONFIG.secret_key, algorithms=JWT_CONFIG.algorithms_tuple)
         return {
             "valid": True,
             "payload": payload,
@@ -76,22 +90,25 @@ async def decode_token(token: str):
             detail="Invalid token"
         )
 
+# Danh sách agents cố định, encode sẵn một lần khi load module
+_AGENTS_RESP_BYTES = orjson.dumps({
+    "agents": [
+        {
+            "id": "facebook_marketing_agent",
+            "name": "Facebook Marketing Agent",
+            "description": "Chuyên gia marketing Facebook"
+        },
+        {
+            "id": "project_manager_agent", 
+            "name": "Project Manager Agent",
+            "description": "Chuyên gia quản lý dự án"
+        }
+    ]
+})
+
 @router.get("/agents")
 async def get_available_agents():
     """
     Lấy danh sách agents có sẵn để chọn khi tạo token
     """
-    return {
-        "agents": [
-            {
-                "id": "facebook_marketing_agent",
-                "name": "Facebook Marketing Agent",
-                "description": "Chuyên gia marketing Facebook"
-            },
-            {
-                "id": "project_manager_agent", 
-                "name": "Project Manager Agent",
-                "description": "Chuyên gia quản lý dự án"
-            }
-        ]
-    }
+    return Response(content=_AGENTS_RESP_BYTES, media_type="application/json")
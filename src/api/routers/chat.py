@@ -5,31 +5,136 @@ from src.api.routers.generator import send_message
 from google.adk.sessions import DatabaseSessionService
 from google.adk.agents import RunConfig
 from google.adk.runners import Runner
-from src.agents import AGENT_MAPPING
+from src.agents import AGENT_INFO
 from google.genai import types
 from src.api.schemas.chats import MessageInput, UnifiedChatRequest, UnifiedChatResponse
 from src.api.logging.logger import get_logger
-from configs import get_database_url
+from configs import get_database_url, get_server_settings
+from src.database.postgres import get_pool, SESSION_ENGINE_KWARGS
 from src.memory.memory_bank import vertexai_memorybank_settings
-from src.api.authentication.dependencies import get_current_active_user
-from google.adk.memory import InMemoryMemoryService
+from src.api.authentication.dependencies import AuthContext, get_auth_context
+from google.adk.memory import InMemoryMemoryService, VertexAiMemoryBankService
+from src.custom.db_artifact_service import CustomDatabaseArtifactService
 from src.api.schemas.sessions import CreateSessionRequest
+from src.utils.agent_context import AGENT_CONTEXT
 
-import requests
-import uuid
+import httpx
+import orjson
+import asyncio
+from cachetools import TTLCache
+from uuid6 import uuid7
 import datetime
-import threading
+from typing import List, Optional, Tuple
 logger = get_logger(__name__)
 router = APIRouter(prefix="/api/v1", tags=["Superb AI Service Chat"])
 
 DB_URL = get_database_url()
-session_service = DatabaseSessionService(db_url=DB_URL)
+session_service = DatabaseSessionService(db_url=DB_URL, **SESSION_ENGINE_KWARGS)
+
+# Ownership check for an existing session, without loading its events.
+# "user:workspace_id" is user-scoped state, so ADK keeps it (unprefixed) in user_states.
+SESSION_OWNERSHIP_QUERY = """
+    SELECT us.state->>'workspace_id' AS workspace_id, s.state->>'agent_id' AS agent_id
+    FROM sessions s
+    LEFT JOIN user_states us ON us.app_name = s.app_name AND us.user_id = s.user_id
+    WHERE s.id = $1 AND s.user_id = $2 AND s.app_name = $3
+"""
+
+
+def build_memory_service():
+    """Use VertexAI Memory Bank if available, otherwise use InMemory"""
+    if (vertexai_memorybank_settings.vertex_project_id and
+        vertexai_memorybank_settings.vertex_agent_engine_id):
+        try:
+            return VertexAiMemoryBankService(
+                project=vertexai_memorybank_settings.vertex_project_id,
+                location=vertexai_memorybank_settings.vertex_location,
+                agent_engine_id=vertexai_memorybank_settings.vertex_agent_engine_id
+            )
+        except Exception as e:
+            logger.warning("Failed to initialize VertexAI Memory Bank: %s", e)
+            return InMemoryMemoryService()
+    logger.info("Using InMemory Memory Service (VertexAI not configured)")
+    return InMemoryMemoryService()
+
+
+# Sessions that recently passed the ownership check, keyed by
+# (session_id, user_id, agent_id, workspace_id). Workspace/agent of a session
+# never change, so hot sessions skip the DB lookup for `ttl` seconds.
+_validated_sessions = TTLCache(maxsize=10_000, ttl=60)
+
+# Identical for every chat request, so built once
+DEFAULT_RUN_CONFIG = RunConfig(
+    streaming_mode=StreamingMode.SSE,
+    max_llm_calls=50,
+    save_input_blobs_as_artifacts=True
+)
+
+# Caps agent runs streaming at once in this process; extra chats wait for a slot
+# instead of piling up LLM calls and DB connections during a burst.
+_RUNNER_SEM = asyncio.Semaphore(get_server_settings().max_concurrent_chats)
+
+# Upper bound for a single downloaded image
+MAX_IMAGE_BYTES = 10 * 1024 * 1024  # 10MB
+IMAGE_CHUNK_SIZE = 64 * 1024
+
+
+# Shared HTTP/2 client for image downloads: images from the same host reuse
+# one connection instead of a new TLS handshake each. Closed in the app lifespan.
+image_http_client = httpx.AsyncClient(
+    http2=True,
+    follow_redirects=True,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+    timeout=httpx.Timeout(10.0, connect=3.0)
+)
+
+
+async def fetch_image(image_url: str) -> Tuple[bytes, Optional[str]]:
+    """Download an image in chunks, rejecting it with 413 once it exceeds MAX_IMAGE_BYTES
+
+    Returns:
+        Tuple of (image bytes, Content-Type header or None)
+    """
+    async with image_http_client.stream("GET", image_url) as res:
+        res.raise_for_status()
+
+        content_length = res.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > MAX_IMAGE_BYTES:
+            raise HTTPException(status_code=413, detail=f"Image {image_url} is larger than {MAX_IMAGE_BYTES} bytes")
+
+        buffer = bytearray()
+        async for chunk in res.aiter_bytes(IMAGE_CHUNK_SIZE):
+            buffer.extend(chunk)
+            if len(buffer) > MAX_IMAGE_BYTES:
+                raise HTTPException(status_code=413, detail=f"Image {image_url} is larger than {MAX_IMAGE_BYTES} bytes")
+
+        return bytes(buffer), res.headers.get("content-type")
+
+
+async def fetch_images(image_urls: List[str]) -> List[Tuple[bytes, Optional[str]]]:
+    """Download all images concurrently, keeping request order
+
+    Failed downloads are logged and skipped; HTTPException (e.g. 413) is re-raised.
+    """
+    urls = [url for url in image_urls if url]
+    results = await asyncio.gather(*(fetch_image(url) for url in urls), return_exceptions=True)
+
+    images = []
+    for image_url, result in zip(urls, results):
+        if isinstance(result, HTTPException):
+            raise result
+        if isinstance(result, BaseException):
+            logger.error("Failed to process image %s: %s", image_url, result)
+            continue
+        images.append(result)
+    return images
 
 # Helper functions for unified chat endpoint
 async def create_new_session_internal(agent_id: str, user_id: str, workspace_id: str) -> dict:
     """Create a new session internally"""
     try:
-        session_id = str(uuid.uuid4())
+        # Time-ordered id: new sessions land at the tail of the sessions primary key index
+        session_id = str(uuid7())
         
         # Create session using session service
         session = await session_service.create_session(
@@ -43,7 +148,8 @@ async def create_new_session_internal(agent_id: str, user_id: str, workspace_id:
             }
         )
         
-        logger.info(f"Created new session: {session_id} for agent: {agent_id}")
+        _validated_sessions[(session_id, user_id, agent_id, workspace_id)] = True
+        logger.info("Created new session: %s for agent: %s", session_id, agent_id)
         return {
             "session_id": session_id,
             "agent_id": agent_id,
@@ -56,9 +162,18 @@ async def create_new_session_internal(agent_id: str, user_id: str, workspace_id:
             # "created_at": session.create_time.isoformat() if session.create_time else None
         }
     except Exception as e:
-        logger.error(f"Failed to create session: {str(e)}")
+        logger.error("Failed to create session: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to create session: {str(e)}")
 
+async def discard_new_session(session_id: str, agent_id: str, user_id: str, workspace_id: str) -> None:
+    """Delete a session created by create_new_session_internal that the request can no longer use"""
+    _validated_sessions.pop((session_id, user_id, agent_id, workspace_id), None)
+    try:
+        await session_service.delete_session(app_name=agent_id, user_id=user_id, session_id=session_id)
+        logger.info("Deleted unused new session: %s", session_id)
+    except Exception as e:
+        logger.error("Failed to delete unused session %s: %s", session_id, e)
+
 async def validate_session_internal(session_id: str, agent_id: str, workspace_id: str, user_id: str) -> dict:
     """Validate existing session internally"""
     try:
@@ -68,38 +183,50 @@ async def validate_session_internal(session_id: str, agent_id: str, workspace_id
                 status_code=400,
                 detail="Session ID cannot be empty"
             )
-        current_session = await session_service.get_session(
-            app_name=agent_id,
-            user_id=user_id,
-            session_id=session_id,
-        )
 
-        if current_session is None:
-            logger.error(f"Session {session_id} not found")
+        cache_key = (session_id, user_id, agent_id, workspace_id)
+        if cache_key in _validated_sessions:
+            return {
+                "session_id": session_id,
+                "agent_id": agent_id,
+                "workspace_id": workspace_id,
+                "validated": True
+            }
+
+        # Only the ownership fields are needed here; skip loading the full session + events
+        pool = await get_pool()
+        async with pool.acquire() as conn:
+            session_row = await conn.fetchrow(
+                SESSION_OWNERSHIP_QUERY, session_id, user_id, agent_id
+            )
+
+        if session_row is None:
+            logger.error("Session %s not found", session_id)
             raise HTTPException(
                 status_code=404,
                 detail=f"Session {session_id} not found. Please create a new session first."
             )
 
         # Validate workspace
-        session_workspace_id = current_session.state.get("user:workspace_id")
+        session_workspace_id = session_row["workspace_id"]
         if session_workspace_id != workspace_id:
-            logger.error(f"Workspace mismatch for session {session_id}")
+            logger.error("Workspace mismatch for session %s", session_id)
             raise HTTPException(
                 status_code=403,
                 detail=f"Access denied. Session belongs to different workspace."
             )
 
         # Validate agent
-        session_agent_id = current_session.state.get("agent_id")
+        session_agent_id = session_row["agent_id"]
         if session_agent_id != agent_id:
-            logger.error(f"Agent mismatch for session {session_id}")
+            logger.error("Agent mismatch for session %s", session_id)
             raise HTTPException(
                 status_code=403,
                 detail=f"Access denied. Session belongs to different agent."
             )
 
-        logger.info(f"Session validation successful for session {session_id}")
+        _validated_sessions[cache_key] = True
+        logger.info("Session validation successful for session %s", session_id)
         return {
             "session_id": session_id,
             "agent_id": agent_id,
@@ -109,306 +236,212 @@ async def validate_session_internal(session_id: str, agent_id: str, workspace_id
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to validate session: {str(e)}")
+        logger.error("Failed to validate session: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to validate session: {str(e)}")
 
 @router.post("/chat/{session_id}")
 async def chat(
+        request: Request,
         data: MessageInput,
         session_id: str = Path(..., description="Session ID to get events for"),
-        current_user: dict = Depends(get_current_active_user)
+        auth: AuthContext = Depends(get_auth_context)
 ):
-    token_data = current_user.get("token_data", {})
-    user_data = current_user.get("user", {})
-
-    user_id = token_data.get("user_id") or user_data.get("id") or user_data.get("user_id")
-    if not user_id:
-        logger.error("User ID not found in token or user data")
-        raise HTTPException(status_code=401, detail="User ID not found in token or user data")
-
-    workspace_id = token_data.get("workspace_id")
-    agent_name = token_data.get("agent_id")
+    user_id = auth.user_id
+    workspace_id = auth.workspace_id
+    agent_name = auth.agent_id
 
     if not session_id:
         logger.error("Session ID not found")
         raise HTTPException(status_code=401, detail="Session ID not found")
 
-    if not workspace_id:
-        logger.error("Workspace ID not found in token")
-        raise HTTPException(status_code=401, detail="Workspace ID not found in token")
-
     if not agent_name:
         logger.error("Agent ID not found in token")
         raise HTTPException(status_code=401, detail="Agent ID not found in token")
 
     logger.info(
-        f"Processing request with token data: user_id={user_id}, session_id={session_id}, workspace_id={workspace_id}, agent_id={agent_name}")
+        "Processing request with token data: user_id=%s, session_id=%s, workspace_id=%s, agent_id=%s",
+        user_id, session_id, workspace_id, agent_name)
 
-    if agent_name not in AGENT_MAPPING:
-        logger.error(f"Agent {agent_name} not found in AGENT_MAPPING")
+    agent_info = AGENT_INFO.get(agent_name)
+    if agent_info is None:
+        logger.error("Agent %s not found in AGENT_MAPPING", agent_name)
         raise HTTPException(status_code=404, detail=f"Agent {agent_name} not found")
+    agent, agent_app_name = agent_info
 
     logger.info(
-        f"User {user_id} starts chatting with Agent {agent_name}, workspace {workspace_id}, session {session_id}")
+        "User %s starts chatting with Agent %s, workspace %s, session %s",
+        user_id, agent_name, workspace_id, session_id)
 
-    agent = AGENT_MAPPING[agent_name]
-
-    current_session = None
-    try:
-        current_session = await session_service.get_session(
-            app_name=agent.name,
-            user_id=user_id,
-            session_id=session_id,
-        )
-
-        if current_session is None:
-            logger.error(f"Session {session_id} not found in database for user {user_id}")
-            raise HTTPException(
-                status_code=404,
-                detail=f"Session {session_id} not found. Please create a new session first."
-            )
-
-        session_workspace_id = current_session.state.get("user:workspace_id")
-        if session_workspace_id != workspace_id:
-            logger.error(
-                f"Workspace mismatch for session {session_id}. "
-                f"Expected: {workspace_id}, Found: {session_workspace_id}"
-            )
-            raise HTTPException(
-                status_code=403,
-                detail=f"Access denied. Session belongs to different workspace."
-            )
-
-        session_agent_id = current_session.state.get("agent_id")
-        if session_agent_id != agent_name:
-            logger.error(
-                f"Agent mismatch for session {session_id}. "
-                f"Expected: {agent_name}, Found: {session_agent_id}"
-            )
-            raise HTTPException(
-                status_code=403,
-                detail=f"Access denied. Session belongs to different agent."
-            )
+    # Session check and image downloads don't depend on each other; overlap them
+    _, images = await asyncio.gather(
+        validate_session_internal(session_id, agent_name, workspace_id, user_id),
+        fetch_images(data.images or [])
+    )
 
-        logger.info(f"Session validation successful for session {session_id}")
+    parts = [types.Part.from_text(text=data.message)]
+    for image_bytes, content_type in images:
+        parts.append(types.Part.from_bytes(
+            data=image_bytes,
+            mime_type=content_type or 'image/png'
+        ))
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Failed to retrieve session for session_id='{session_id}' "
-                     f"and user_id='{user_id}': {e}")
-        raise HTTPException(
-            status_code=500,
-            detail="Failed to validate session. Please try again."
-        )
-    image_part = types.Part()
-
-    if data.images and len(data.images) > 0:
-        for image_url in data.images:
-            if image_url:
-                try:
-                    res = requests.get(image_url)
-                    res.raise_for_status()
-
-                    image_bytes = res.content
-                    mime_type = res.headers.get('Content-Type', 'image/png')
-                    image_part = types.Part.from_bytes(
-                        data=image_bytes,
-                        mime_type=mime_type
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to process image {image_url}: {e}")
-
-    text_part = types.Part.from_text(text=data.message)
-    print(text_part, image_part)
-    user_message = types.Content(role="user", parts=[text_part, image_part])
-    print(user_message)
-
-    # Use VertexAI Memory Bank if available, otherwise use InMemory
-    if (vertexai_memorybank_settings.vertex_project_id and 
-        vertexai_memorybank_settings.vertex_agent_engine_id):
-        try:
-            memory_service = VertexAiMemoryBankService(
-                project=vertexai_memorybank_settings.vertex_project_id,
-                location=vertexai_memorybank_settings.vertex_location,
-                agent_engine_id=vertexai_memorybank_settings.vertex_agent_engine_id
-            )
-        except Exception as e:
-            logger.warning(f"Failed to initialize VertexAI Memory Bank: {e}")
-            memory_service = InMemoryMemoryService()
-    else:
-        logger.info("Using InMemory Memory Service (VertexAI not configured)")
-        memory_service = InMemoryMemoryService()
+    user_message = types.Content(role="user", parts=parts)
+    logger.debug("User message: %s", user_message)
 
-    from src.custom.db_artifact_service import CustomDatabaseArtifactService
     artifact_service = CustomDatabaseArtifactService(
         db_url=DB_URL,
+        pool=await get_pool(),
         user_id=user_id,
         workspace_id=workspace_id,
         agent_id=agent_name,
         session_id=session_id
     )
 
-    # Set context for tools (thread-local storage) - for old endpoint too
+    # Set context for tools (per-request context var) - for old endpoint too
     context = {
         'workspace_id': workspace_id,
         'user_id': user_id,
-        'user_name': user_data.get('user_name') or f"User_{user_id}",
+        'user_name': auth.user_name,
         'session_id': session_id,
         'agent_id': agent_name
     }
-    threading.current_thread().agent_context = context
-    logger.info(f"Set agent context (old endpoint): {context}")
+    AGENT_CONTEXT.set(context)
+    logger.info("Set agent context (old endpoint): %s", context)
 
-    runner = Runner(
-        app_name=agent.name,
+    # Build the runner off the event loop so it doesn't delay the first SSE byte
+    runner = await asyncio.to_thread(
+        Runner,
+        app_name=agent_app_name,
         agent=agent,
         session_service=session_service,
-        memory_service=memory_service,
+        memory_service=request.app.state.memory_service,
         artifact_service=artifact_service,
     )
 
-    run_config = RunConfig(
-        streaming_mode=StreamingMode.SSE,
-        max_llm_calls=50,
-        save_input_blobs_as_artifacts=True
-    )
-
     events = runner.run_async(
         user_id=user_id,
         session_id=session_id,
         new_message=user_message,
-        run_config=run_config
+        run_config=DEFAULT_RUN_CONFIG
     )
 
     async def async_generator():
-        async for content in send_message(events=events):
-            yield content
+        async with _RUNNER_SEM:
+            async for content in send_message(events=events):
+                yield content
 
     return StreamingResponse(async_generator(), media_type="text/event-stream")
 
 
 @router.post("/chat")
 async def unified_chat(
+    request: Request,
     data: UnifiedChatRequest,
-    current_user: dict = Depends(get_current_active_user)
+    auth: AuthContext = Depends(get_auth_context)
 ):
     """
     Unified chat endpoint with automatic session management
     - If session_id is None: creates new session
     - If session_id is provided: validates and uses existing session
     """
-    token_data = current_user.get("token_data", {})
-    user_data = current_user.get("user", {})
-
-    # Extract user info from JWT
-    user_id = token_data.get("user_id") or user_data.get("id") or user_data.get("user_id")
-    if not user_id:
-        logger.error("User ID not found in token")
-        raise HTTPException(status_code=401, detail="User ID not found in token")
-
-    workspace_id = token_data.get("workspace_id")
-    if not workspace_id:
-        logger.error("Workspace ID not found in token")
-        raise HTTPException(status_code=401, detail="Workspace ID not found in token")
-    # Extract user_name from token or user_data  
-    user_name = token_data.get("user_name") or user_data.get("user_name") or user_data.get("name") or f"User_{user_id}"
+    user_id = auth.user_id
+    workspace_id = auth.workspace_id
+    user_name = auth.user_name
     # Validate agent exists
-    if data.agent_id not in AGENT_MAPPING:
-        logger.error(f"Agent {data.agent_id} not found in AGENT_MAPPING")
+    agent_info = AGENT_INFO.get(data.agent_id)
+    if agent_info is None:
+        logger.error("Agent %s not found in AGENT_MAPPING", data.agent_id)
         raise HTTPException(status_code=404, detail=f"Agent {data.agent_id} not found")
+    agent, agent_app_name = agent_info
 
-    logger.info(f"Processing unified chat request: user_id={user_id}, agent_id={data.agent_id}, session_id={data.session_id}")
+    logger.info("Processing unified chat request: user_id=%s, agent_id=%s, session_id=%s", user_id, data.agent_id, data.session_id)
 
-    created_session = False
-    session_id = data.session_id
+    async def prepare_session() -> Tuple[str, bool]:
+        """Return (session_id, created_session)"""
+        session_id = data.session_id
+        if not session_id or (isinstance(session_id, str) and session_id.strip() == ""):
+            # Create new session
+            logger.info("Creating new session for agent: %s", data.agent_id)
+            session_info = await create_new_session_internal(
+                agent_id=data.agent_id,
+                user_id=user_id,
+                workspace_id=workspace_id
+            )
+            logger.info("New session created: %s", session_info["session_id"])
+            return session_info["session_id"], True
 
-    # Handle session logic
-    if not session_id or (isinstance(session_id, str) and session_id.strip() == ""):
-        # Create new session
-        logger.info(f"Creating new session for agent: {data.agent_id}")
-        session_info = await create_new_session_internal(
-            agent_id=data.agent_id,
-            user_id=user_id,
-            workspace_id=workspace_id
-        )
-        session_id = session_info["session_id"]
-        created_session = True
-        logger.info(f"New session created: {session_id}")
-    else:
         # Validate existing session
-        logger.info(f"Validating existing session: {session_id}")
+        logger.info("Validating existing session: %s", session_id)
         await validate_session_internal(session_id, data.agent_id, workspace_id, user_id)
-        logger.info(f"Session validation successful: {session_id}")
-
-    # Get agent
-    agent = AGENT_MAPPING[data.agent_id]
-
-    # Prepare message parts (reuse existing logic)
-    image_part = types.Part()
-    if data.images and len(data.images) > 0:
-        for image_url in data.images:
-            if image_url:
-                try:
-                    res = requests.get(image_url)
-                    res.raise_for_status()
-                    image_part = types.Part.from_bytes(
-                        data=res.content,
-                        mime_type=res.headers.get("content-type", "image/jpeg")
-                    )
-                    break
-                except Exception as e:
-                    logger.warning(f"Failed to load image from {image_url}: {e}")
-
-    text_part = types.Part.from_text(text=data.message)
-    user_message = types.Content(role="user", parts=[text_part, image_part])
-
-    # Use InMemory Memory Service (simple and reliable)
-    logger.info("Using InMemory Memory Service")
-    memory_service = InMemoryMemoryService()
+        logger.info("Session validation successful: %s", session_id)
+        return session_id, False
+
+    # Session create/validate and image downloads are independent; overlap them
+    session_result, images = await asyncio.gather(
+        prepare_session(),
+        fetch_images(data.images or []),
+        return_exceptions=True
+    )
+    if isinstance(images, BaseException):
+        # Don't leave a freshly created session behind when an image is rejected (e.g. 413)
+        if not isinstance(session_result, BaseException) and session_result[1]:
+            await discard_new_session(session_result[0], data.agent_id, user_id, workspace_id)
+        raise images
+    if isinstance(session_result, BaseException):
+        raise session_result
+    session_id, created_session = session_result
+
+    # Prepare message parts; only the first image that downloads successfully is attached
+    parts = [types.Part.from_text(text=data.message)]
+    if images:
+        image_bytes, content_type = images[0]
+        parts.append(types.Part.from_bytes(
+            data=image_bytes,
+            mime_type=content_type or "image/jpeg"
+        ))
+
+    user_message = types.Content(role="user", parts=parts)
+
+    # Use InMemory Memory Service (simple and reliable), shared across requests
+    memory_service = request.app.state.inmemory_memory_service
 
     # Setup artifact service
-    from src.custom.db_artifact_service import CustomDatabaseArtifactService
     artifact_service = CustomDatabaseArtifactService(
         db_url=DB_URL,
+        pool=await get_pool(),
         user_id=user_id,
         workspace_id=workspace_id,
         agent_id=data.agent_id,
         session_id=session_id
     )
 
-    # Set context for tools (thread-local storage)
+    # Set context for tools (per-request context var)
     context = {
         'workspace_id': workspace_id,
         'user_id': user_id,
-        'user_name': user_name or f"User_{user_id}",
+        'user_name': user_name,
         'session_id': session_id,
         'agent_id': data.agent_id
     }
-    threading.current_thread().agent_context = context
-    logger.info(f"Set agent context: {context}")
+    AGENT_CONTEXT.set(context)
+    logger.info("Set agent context: %s", context)
 
     # Setup runner
-    runner = Runner(
-        app_name=agent.name,
+    runner = await asyncio.to_thread(
+        Runner,
+        app_name=agent_app_name,
         agent=agent,
         session_service=session_service,
         memory_service=memory_service,
         artifact_service=artifact_service,
     )
 
-    run_config = RunConfig(
-        streaming_mode=StreamingMode.SSE,
-        max_llm_calls=50,
-        save_input_blobs_as_artifacts=True
-    )
-
     # Run the agent
     events = runner.run_async(
         user_id=user_id,
         session_id=session_id,
         new_message=user_message,
-        run_config=run_config
+        run_config=DEFAULT_RUN_CONFIG
     )
 
     # Return streaming response with session info in headers
@@ -420,17 +453,20 @@ async def unified_chat(
             "created_session": created_session,
             "message": data.message
         }
-        yield f"data: {{'type': 'session_info', 'data': {session_info}}}\n\n"
+        yield b"data: " + orjson.dumps({"type": "session_info", "data": session_info}) + b"\n\n"
         
         # Then yield agent responses
-        async for content in send_message(events=events):
-            yield content
-
-    response = StreamingResponse(async_generator(), media_type="text/event-stream")
-    
-    # Add session info to response headers
-    response.headers["X-Session-ID"] = session_id
-    response.headers["X-Agent-ID"] = data.agent_id
-    response.headers["X-Created-Session"] = str(created_session)
-    
-    return response
\ No newline at end of file
+        async with _RUNNER_SEM:
+            async for content in send_message(events=events):
+                yield content
+
+    # Session info goes in the response headers too
+    return StreamingResponse(
+        async_generator(),
+        media_type="text/event-stream",
+        headers={
+            "X-Session-ID": session_id,
+            "X-Agent-ID": data.agent_id,
+            "X-Created-Session": str(created_session)
+        }
+    )
\ No newline at end of file
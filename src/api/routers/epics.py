@@ -1,17 +1,38 @@
+from contextlib import asynccontextmanager
 from fastapi import APIRouter, Depends, HTTPException, status
-from src.api.authentication.dependencies import get_current_active_user, get_epic_context
-from src.api.schemas.epics import CreateEpicRequest, CreateEpicResponse, CreateTaskRequest, CreateTaskResponse, DeleteTaskRequest, DeleteTaskResponse, GetTaskResponse, UpdateTaskRequest, UpdateTaskResponse, ListEpicsResponse, TypeEnum
+from src.api.authentication.dependencies import get_epic_context, EpicCtx
+from src.api.schemas.epics import CreateEpicRequest, CreateEpicResponse, CreateTaskRequest, CreateTaskResponse, DeleteTaskRequest, DeleteTaskResponse, GetTaskResponse, UpdateTaskRequest, UpdateTaskResponse, ListEpicsResponse, ListTypeEnum, TypeEnum
 from src.api.services.epic_service import epic_service
 from src.api.logging.logger import get_logger
-import logging
 
 logger = get_logger(__name__)
 router = APIRouter(prefix="/api/v1/epics", tags=["Epic Management"])
 
+# Chuỗi cố định cho response message, dựng sẵn một lần
+_TYPE_DISPLAY = {"Epic": "epics", "Task": "tasks", "Sub_task": "sub_tasks", "All": "items"}
+_CREATED_MESSAGES = {t: f"{t.value} created successfully" for t in TypeEnum}
+
+@asynccontextmanager
+async def _wrap_errors(action: str):
+    """Giữ nguyên HTTPException, chuyển lỗi khác thành HTTP 500 "Failed to {action}"
+
+    Chi tiết lỗi và traceback chỉ ghi vào log, không trả về client
+    """
+    try:
+        yield
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Failed to %s", action)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to {action}"
+        )
+
 @router.post("/create", response_model=CreateEpicResponse)
 async def create_epic(
     request: CreateEpicRequest,
-    epic_context: dict = Depends(get_epic_context)
+    epic_context: EpicCtx = Depends(get_epic_context)
 ):
     """
     Tạo epic mới trong hệ thống
@@ -27,13 +48,11 @@ async def create_epic(
     
     JWT token chỉ cần chứa: workspace_id, user_id, user_name
     """
-    try:
+    async with _wrap_errors("create epic"):
         # Lấy thông tin từ JWT context (chỉ workspace_id, user_id, user_name)
-        workspace_id = epic_context["workspace_id"]
-        user_id = epic_context["user_id"]
-        user_name = epic_context["user_name"]
+        workspace_id, user_id, user_name = epic_context
         
-        logger.info(f"Creating epic '{request.epic_name}' for user {user_name} ({user_id}) in workspace {workspace_id}")
+        logger.info("Creating epic '%s' for user %s (%s) in workspace %s", request.epic_name, user_name, user_id, workspace_id)
         
         # Gọi service để tạo epic với thông tin đơn giản
         epic = await epic_service.create_epic_simple(
@@ -43,28 +62,18 @@ async def create_epic(
             user_name=user_name
         )
         
-        logger.info(f"Epic created successfully: {epic.epic_id}")
+        logger.info("Epic created successfully: %s", epic.epic_id)
         
         return CreateEpicResponse(
             status="success",
             message=f"Epic '{request.epic_name}' created successfully",
             epic=epic
         )
-        
-    except HTTPException:
-        # Re-raise HTTP exceptions
-        raise
-    except Exception as e:
-        logger.error(f"Error creating epic: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to create epic: {str(e)}"
-        )
 
 @router.post("/create-task", response_model=CreateTaskResponse)
 async def create_task_unified(
     request: CreateTaskRequest,
-    epic_context: dict = Depends(get_epic_context)
+    epic_context: EpicCtx = Depends(get_epic_context)
 ):
     """
     API thống nhất để tạo Epic, Task, hoặc Sub_task
@@ -88,13 +97,11 @@ async def create_task_unified(
     
     JWT token chỉ cần chứa: workspace_id, user_id, user_name
     """
-    try:
+    async with _wrap_errors(f"create {request.type.value}"):
         # Lấy thông tin từ JWT context
-        workspace_id = epic_context["workspace_id"]
-        user_id = epic_context["user_id"]
-        user_name = epic_context["user_name"]
+        workspace_id, user_id, user_name = epic_context
         
-        logger.info(f"Creating {request.type.value} for user {user_name} ({user_id}) in workspace {workspace_id}")
+        logger.info("Creating %s for user %s (%s) in workspace %s", request.type.value, user_name, user_id, workspace_id)
         
         # Gọi service để tạo task thống nhất
         task = await epic_service.create_task_unified(
@@ -104,27 +111,18 @@ async def create_task_unified(
             user_name=user_name
         )
         
-        logger.info(f"{request.type.value} created successfully: {task.epic_id}")
+        logger.info("%s created successfully: %s", request.type.value, task.epic_id)
         
         return CreateTaskResponse(
             status="success",
-            message=f"{request.type.value} created successfully",
+            message=_CREATED_MESSAGES[request.type],
             task=task
         )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error creating {request.type.value}: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to create {request.type.value}: {str(e)}"
-        )
 
 @router.get("/list", response_model=ListEpicsResponse)
 async def list_epics(
-    epic_context: dict = Depends(get_epic_context),
-    type: str = None
+    epic_context: EpicCtx = Depends(get_epic_context),
+    type: ListTypeEnum = ListTypeEnum.EPIC  # Mặc định là Epic để backward compatible
 ):
     """
     Lấy danh sách epics/tasks/subtasks theo workspace_id, user_id từ JWT token
@@ -132,59 +130,36 @@ async def list_epics(
     Query Parameters:
     - type: Epic, Task, Sub_task, hoặc All (mặc định: Epic)
     """
-    try:
+    async with _wrap_errors(f"list {type.value}"):
         # Lấy thông tin từ JWT context
-        workspace_id = epic_context["workspace_id"]
-        user_id = epic_context["user_id"]
-        user_name = epic_context["user_name"]
-        
-        # Xử lý type parameter
-        if type is None:
-            type = "Epic"  # Mặc định là Epic để backward compatible
+        workspace_id, user_id, user_name = epic_context
         
-        # Validate type
-        valid_types = ["Epic", "Task", "Sub_task", "All"]
-        if type not in valid_types:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid type. Must be one of: {', '.join(valid_types)}"
-            )
+        # type đã được FastAPI validate theo ListTypeEnum
+        type = type.value
         
-        logger.info(f"Listing {type} for user {user_name} ({user_id}) in workspace {workspace_id}")
+        logger.info("Listing %s for user %s (%s) in workspace %s", type, user_name, user_id, workspace_id)
         
         # Gọi service với type filter
-        items = await epic_service.list_tasks_by_type(
+        items = await epic_service.load_tasks_by_type(
             workspace_id=workspace_id,
             user_id=user_id,
             type_filter=type
         )
         
-        logger.info(f"Service returned {len(items)} {type.lower()}s")
-        
-        # Tạo message phù hợp
-        type_display = type.lower() + "s" if type != "All" else "items"
+        logger.info("Service returned %s %ss", len(items), type.lower())
         
         return ListEpicsResponse(
             status="success",
-            message=f"Found {len(items)} {type_display} for user {user_name} in workspace {workspace_id}",
+            message=f"Found {len(items)} {_TYPE_DISPLAY[type]} for user {user_name} in workspace {workspace_id}",
             total_count=len(items),
             workspace_id=workspace_id,
             epics=items  # Vẫn dùng field "epics" để backward compatible
         )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error listing {type}: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to list {type}: {str(e)}"
-        )
 
 @router.get("/get", response_model=GetTaskResponse)
 async def get_task_by_id(
     item_id: str,
-    epic_context: dict = Depends(get_epic_context)
+    epic_context: EpicCtx = Depends(get_epic_context)
 ):
     """
     Lấy Epic/Task/Sub_task theo ID với cascade logic
@@ -202,7 +177,7 @@ async def get_task_by_id(
     - total_count: Tổng số items trả về
     - items: Array chứa item chính + related items
     """
-    try:
+    async with _wrap_errors("get item"):
         # Validate item_id parameter
         if not item_id or not item_id.strip():
             raise HTTPException(
@@ -211,38 +186,27 @@ async def get_task_by_id(
             )
         
         # Lấy thông tin từ JWT context
-        workspace_id = epic_context["workspace_id"]
-        user_id = epic_context["user_id"]
-        user_name = epic_context["user_name"]
+        workspace_id, user_id, user_name = epic_context
         
-        logger.info(f"Get request - item_id: {item_id}, user: {user_name} ({user_id}), workspace: {workspace_id}")
+        logger.info("Get request - item_id: %s, user: %s (%s), workspace: %s", item_id, user_name, user_id, workspace_id)
         
         # Gọi service để lấy item với cascade
-        result = await epic_service.get_task_by_id_cascade(
+        result = await epic_service.load_task_by_id(
             item_id=item_id,
             workspace_id=workspace_id,
             user_id=user_id
         )
         
-        logger.info(f"Get completed - found {result.total_count} items of type {result.item_type}")
+        logger.info("Get completed - found %s items of type %s", result.total_count, result.item_type)
         
         return result
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting item {item_id}: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to get item: {str(e)}"
-        )
 
 @router.put("/update", response_model=UpdateTaskResponse)
 async def update_task_by_type(
     request: UpdateTaskRequest,
     type: TypeEnum,
     id: str,
-    epic_context: dict = Depends(get_epic_context)
+    epic_context: EpicCtx = Depends(get_epic_context)
 ):
     """
     Update Epic/Task/Sub_task theo type và ID
@@ -265,7 +229,7 @@ async def update_task_by_type(
     - assignee_name, assignee_id
     - start_date, due_date, deadline_extend (dd/MM/yyyy)
     """
-    try:
+    async with _wrap_errors(f"update {type.value}"):
         # Validate parameters
         if not id or not id.strip():
             raise HTTPException(
@@ -274,11 +238,9 @@ async def update_task_by_type(
             )
         
         # Lấy thông tin từ JWT context
-        workspace_id = epic_context["workspace_id"]
-        user_id = epic_context["user_id"]
-        user_name = epic_context["user_name"]
+        workspace_id, user_id, user_name = epic_context
         
-        logger.info(f"Update request - type: {type.value}, id: {id}, user: {user_name} ({user_id}), workspace: {workspace_id}")
+        logger.info("Update request - type: %s, id: %s, user: %s (%s), workspace: %s", type.value, id, user_name, user_id, workspace_id)
         
         # Gọi service để update
         result = await epic_service.update_task_by_type(
@@ -289,23 +251,14 @@ async def update_task_by_type(
             user_id=user_id
         )
         
-        logger.info(f"Update completed - {type.value} {id}")
+        logger.info("Update completed - %s %s", type.value, id)
         
         return result
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error updating {type.value} {id}: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to update {type.value}: {str(e)}"
-        )
 
 @router.post("/delete", response_model=DeleteTaskResponse)
 async def delete_task_cascade(
     request: DeleteTaskRequest,
-    epic_context: dict = Depends(get_epic_context)
+    epic_context: EpicCtx = Depends(get_epic_context)
 ):
     """
     Xóa Epic/Task/Sub_task với cascade logic
@@ -323,13 +276,11 @@ async def delete_task_cascade(
     - Chỉ xóa items thuộc sở hữu của user trong workspace
     - Transaction-based để đảm bảo data integrity
     """
-    try:
+    async with _wrap_errors("delete item"):
         # Lấy thông tin từ JWT context
-        workspace_id = epic_context["workspace_id"]
-        user_id = epic_context["user_id"]
-        user_name = epic_context["user_name"]
+        workspace_id, user_id, user_name = epic_context
         
-        logger.info(f"Delete request - item_id: {request.item_id}, user: {user_name} ({user_id}), workspace: {workspace_id}, dry_run: {request.dry_run}")
+        logger.info("Delete request - item_id: %s, user: %s (%s), workspace: %s, dry_run: %s", request.item_id, user_name, user_id, workspace_id, request.dry_run)
         
         # Gọi service để xóa với cascade
         result = await epic_service.delete_task_cascade(
@@ -340,15 +291,6 @@ async def delete_task_cascade(
         )
         
         action = "Preview" if request.dry_run else "Deleted"
-        logger.info(f"{action} completed - {result.deleted_count}")
+        logger.info("%s completed - %s", action, result.deleted_count)
         
         return result
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error deleting item {request.item_id}: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to delete item: {str(e)}"
-        )
@@ -1,11 +1,36 @@
 from src.api.logging.logger import get_logger
-import json
+import orjson
 import re
 import asyncio
-import time
+from bisect import bisect_right
 
 logger = get_logger(__name__)
 
+# Minimum gap between streamed message chunks, in seconds
+CHUNK_INTERVAL = 0.040
+
+# SSE frames are yielded as bytes (one event per yield) so Starlette sends them without re-encoding
+_STREAM_END = b"event: stream_end\n"
+_DONE_STOP = b"data: {\"done\": true, \"reason\": \"stop\"}\n\n"
+_DONE_CANCELLED = b"data: {\"done\": true, \"reason\": \"cancelled\"}\n\n"
+_THINKING = b"event: thinking\ndata: "
+_EXECUTION_TOOL = b"event: execution_tool\ndata: "
+_MESSAGE_CHUNK = b"event: message_chunk\ndata: "
+_STREAM_ERROR = b"event: stream_error\ndata: "
+_FRAME_END = b"\n\n"
+# orjson writes UTF-8 bytes directly (no ensure_ascii pass); bound once for the hot loop
+_dump = orjson.dumps
+
+# Patterns used on every streamed chunk, compiled once at import
+_SENTENCE_SPLIT = re.compile(r'([.!?]+\s*)')
+_PUNCT_ONLY = re.compile(r'^[.!?]+\s*$')
+_LIST_AFTER_PUNCT_NUM = re.compile(r'([.!?…])\s*(\d+\.\s)')
+_LIST_AFTER_PUNCT_STAR = re.compile(r'([.!?…])\s*(\*\s)')
+_GLUED_NUM = re.compile(r'([.!?…])(\d+\.)')
+_BACKTICK = re.compile(r'`')
+_TERMINATOR = re.compile(r'[.!?…\n]')
+_SENTENCE_ENDINGS = (".", "!", "?", "…", "\n")
+
 
 def hybrid_streaming_split(text):
     """
@@ -16,7 +41,7 @@ def hybrid_streaming_split(text):
         return [text]
     
     # Split by sentences first (by punctuation)
-    sentences = re.split(r'([.!?]+\s*)', text)
+    sentences = _SENTENCE_SPLIT.split(text)
     
     chunks = []
     for sentence in sentences:
@@ -24,7 +49,7 @@ def hybrid_streaming_split(text):
             continue
             
         # If it's punctuation, add to previous chunk
-        if re.match(r'^[.!?]+\s*$', sentence):
+        if _PUNCT_ONLY.match(sentence):
             if chunks:
                 chunks[-1] += sentence
             continue
@@ -50,29 +75,43 @@ def chunk_markdown_safe(text, budget_chars=160):
     if not text:
         return []
 
-    buffer = []
-    backticks_open = False  # rudimentary inline-code tracking
-
-    def flush():
-        chunk = ''.join(buffer)
-        buffer.clear()
-        return chunk
+    n = len(text)
+    # Backtick positions, for rudimentary inline-code tracking: an index is
+    # inside inline code when an odd number of backticks precede or sit on it
+    backticks = [m.start() for m in _BACKTICK.finditer(text)]
 
     chunks = []
-    for ch in text:
-        buffer.append(ch)
-        if ch == '`':
-            backticks_open = not backticks_open
-        # End conditions when not inside inline code
-        if not backticks_open and (ch in ".!?…\n" or len(buffer) >= budget_chars):
-            chunk = flush()
-            if chunk.strip():
-                chunks.append(chunk)
+    start = 0
+    pos = 0
+    term = -1
+    while pos < n:
+        # Next sentence terminator; searched again only once the cursor passes it
+        if term < pos:
+            m = _TERMINATOR.search(text, pos)
+            term = m.start() if m else n
+        # Index at which the chunk reaches the character budget
+        end = min(term, max(start + budget_chars - 1, pos))
+        if end >= n:
+            break
+
+        k = bisect_right(backticks, end)
+        if k % 2:
+            # Inside inline code: nothing can flush before the closing backtick
+            if k == len(backticks):
+                break
+            end = backticks[k]
+            if end - start + 1 < budget_chars:
+                pos = end + 1
+                continue
 
-    if buffer:
-        chunk = flush()
+        chunk = text[start:end + 1]
         if chunk.strip():
             chunks.append(chunk)
+        start = pos = end + 1
+
+    chunk = text[start:]
+    if chunk.strip():
+        chunks.append(chunk)
 
     return chunks
 
@@ -82,16 +121,26 @@ def chunk_by_bytes(text, max_bytes=1800):
     if not text:
         return []
 
-    buf = bytearray()
+    data = text.encode("utf-8")
+    if len(data) <= max_bytes:
+        return [text]
+
     chunks = []
-    for ch in text:
-        b = ch.encode("utf-8")
-        if len(buf) + len(b) > max_bytes:
-            chunks.append(buf.decode("utf-8"))
-            buf = bytearray()
-        buf.extend(b)
-    if buf:
-        chunks.append(buf.decode("utf-8"))
+    start = 0
+    total = len(data)
+    while start < total:
+        end = start + max_bytes
+        if end < total:
+            # Back up off UTF-8 continuation bytes to land on a codepoint boundary
+            while end > start and data[end] & 0xC0 == 0x80:
+                end -= 1
+            if end == start:
+                # A single codepoint wider than max_bytes: emit it whole
+                end = start + 1
+                while end < total and data[end] & 0xC0 == 0x80:
+                    end += 1
+        chunks.append(data[start:end].decode("utf-8"))
+        start = end
     return chunks
 
 
@@ -99,18 +148,23 @@ def normalize_lists(text):
     """Normalize list formatting so numbered/bullet items start on a new line.
     This does not change semantics, only presentation whitespace.
     """
-    if not text:
+    # Every pattern below starts with sentence punctuation; most pieces have
+    # no list markers, so skip the regex passes when none can match
+    if not text or not any(c in text for c in ".!?…"):
         return text
     # After sentence end, ensure list markers start on new line
-    text = re.sub(r'([.!?…])\s*(\d+\.\s)', r'\1\n\2', text)
-    text = re.sub(r'([.!?…])\s*(\*\s)', r'\1\n\2', text)
+    text = _LIST_AFTER_PUNCT_NUM.sub(r'\1\n\2', text)
+    if "*" in text:
+        text = _LIST_AFTER_PUNCT_STAR.sub(r'\1\n\2', text)
     # Fix glued pattern like ".2." → ".\n2. "
-    text = re.sub(r'([.!?…])(\d+\.)', r'\1\n\2 ', text)
+    text = _GLUED_NUM.sub(r'\1\n\2 ', text)
     return text
 
 async def send_message(events):
     try:
         text_buffer = ""
+        loop = asyncio.get_running_loop()
+        last_emit = 0.0  # loop.time() of the last message_chunk, for pacing
         async for event in events:
             # logger.info(f"[EVENT RAW] {event}")
             if not event.content or not event.content.parts:
@@ -123,8 +177,7 @@ async def send_message(events):
                         "args": func_call.args or {}
                     }
 
-                    yield "event: thinking\n"
-                    yield f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+                    yield _THINKING + _dump(payload) + _FRAME_END
 
                 elif hasattr(part, "function_response") and part.function_response is not None:
                     func_resp = part.function_response
@@ -132,8 +185,7 @@ async def send_message(events):
                         "function_name": func_resp.name,
                         "response": func_resp.response or {}
                     }
-                    yield "event: execution_tool\n"
-                    yield f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+                    yield _EXECUTION_TOOL + _dump(payload) + _FRAME_END
 
                 elif hasattr(part, "text") and part.text:
                     # Preserve whitespace to avoid glued words during streaming
@@ -143,8 +195,9 @@ async def send_message(events):
                     if getattr(event, "partial", False):
                         # ✅ BUFFERED SENTENCE/SEGMENT STREAMING
                         # Accumulate incoming partials, emit only complete segments.
+                        # text_buffer only ever holds the unfinished tail of the
+                        # previous partial, so each event rescans O(tail + delta).
                         text_buffer += text
-                        last_emit = time.time()
                         pieces = chunk_markdown_safe(text_buffer, budget_chars=160)
                         # If we got at least one piece and the buffer seems to end
                         # with an incomplete tail (no terminal punctuation/newline),
@@ -153,38 +206,35 @@ async def send_message(events):
                         if pieces:
                             # Heuristic: if original buffer does not end with punctuation/newline,
                             # treat last piece as remainder.
-                            if not text_buffer.endswith(tuple([".", "!", "?", "…", "\n"])):
-                                remainder = pieces[-1]
-                                pieces = pieces[:-1]
+                            if not text_buffer.endswith(_SENTENCE_ENDINGS):
+                                remainder = pieces.pop()
                         for piece in pieces:
                             piece = normalize_lists(piece)
                             for safe in chunk_by_bytes(piece, max_bytes=1800):
-                                elapsed_ms = (time.time() - last_emit) * 1000
-                                if elapsed_ms < 40:
-                                    await asyncio.sleep((40 - elapsed_ms) / 1000)
-                                yield "event: message_chunk\n"
-                                yield f"data: {json.dumps(safe, ensure_ascii=False)}\n\n"
-                                last_emit = time.time()
-                        text_buffer = remainder or (text_buffer if not pieces else (remainder))
-
-        yield "event: stream_end\n"
+                                # Keep chunks at least CHUNK_INTERVAL apart
+                                wait = last_emit + CHUNK_INTERVAL - loop.time()
+                                if wait > 0:
+                                    await asyncio.sleep(wait)
+                                yield _MESSAGE_CHUNK + _dump(safe) + _FRAME_END
+                                last_emit = loop.time()
+                        if remainder or pieces:
+                            text_buffer = remainder
+
+        yield _STREAM_END
         # Flush any leftover buffer at the end as a final chunk
         if 'text_buffer' in locals() and text_buffer and text_buffer.strip():
             for safe in chunk_by_bytes(text_buffer, max_bytes=1800):
-                yield "event: message_chunk\n"
-                yield f"data: {json.dumps(safe, ensure_ascii=False)}\n\n"
-        yield "data: {\"done\": true, \"reason\": \"stop\"}\n\n"
+                yield _MESSAGE_CHUNK + _dump(safe) + _FRAME_END
+        yield _DONE_STOP
 
     except GeneratorExit:
-        yield "event: stream_end\n"
+        yield _STREAM_END
         # Attempt to flush remaining buffer on cancellation
         if 'text_buffer' in locals() and text_buffer and text_buffer.strip():
             for safe in chunk_by_bytes(text_buffer, max_bytes=1800):
-                yield "event: message_chunk\n"
-                yield f"data: {json.dumps(safe, ensure_ascii=False)}\n\n"
-        yield "data: {\"done\": true, \"reason\": \"cancelled\"}\n\n"
+                yield _MESSAGE_CHUNK + _dump(safe) + _FRAME_END
+        yield _DONE_CANCELLED
         raise
     except Exception as e:
-        yield "event: stream_error\n"
-        yield f"data: {json.dumps({'error': str(e), 'done': True}, ensure_ascii=False)}\n\n"
+        yield _STREAM_ERROR + _dump({'error': str(e), 'done': True}) + _FRAME_END
         raise
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from src.api.schemas.members import CreateMemberRequest, CreateMemberResponse, ListMembersResponse, UpdateMemberRequest, UpdateMemberResponse
 from src.api.services.member_service import member_service
-from src.api.authentication.dependencies import get_current_active_user
+from src.api.authentication.dependencies import AuthContext, get_auth_context
 from src.api.logging.logger import get_logger
 import logging
 
@@ -11,7 +11,7 @@ logger = get_logger(__name__)
 @router.post("/create", response_model=CreateMemberResponse)
 async def create_member(
     request: CreateMemberRequest,
-    current_user: dict = Depends(get_current_active_user)
+    auth: AuthContext = Depends(get_auth_context)
 ):
     """
     Tạo member mới trong hệ thống
@@ -23,38 +23,12 @@ async def create_member(
     JWT token sẽ tự động cung cấp: workspace_id, user_id
     """
     try:
-        # Lấy thông tin từ JWT token đã được parse
-        token_data = current_user.get("token_data", {})
-        user_data = current_user.get("user", {})
+        # user_id/workspace_id đã được get_auth_context validate
+        user_id, workspace_id = auth.user_id, auth.workspace_id
         
-        # Extract thông tin cần thiết từ JWT
-        user_id = token_data.get("user_id") or user_data.get("id")
-        workspace_id = token_data.get("workspace_id")
+        logger.debug("DEBUG - Extracted - workspace_id: '%s', user_id: '%s'", workspace_id, user_id)
         
-        logger.info(f"DEBUG - JWT Token data: {token_data}")
-        logger.info(f"DEBUG - Extracted - workspace_id: '{workspace_id}', user_id: '{user_id}'")
-        
-        # Validation các thông tin bắt buộc từ JWT
-        if not user_id:
-            logger.error("User ID not found in JWT token")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User ID not found in token"
-            )
-        
-        if not workspace_id:
-            logger.error("Workspace ID not found in JWT token")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Workspace ID not found in token"
-            )
-        
-        # Validation request data
-        if not request.member_name or request.member_name.strip() == "":
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Member name is required"
-            )
+        # member_name rỗng đã bị CreateMemberRequest chặn (422)
         
         # Gọi service để tạo member
         logger.info(f"Creating member: {request.member_name}")
@@ -78,7 +52,7 @@ async def create_member(
 
 @router.get("/list", response_model=ListMembersResponse)
 async def list_members(
-    current_user: dict = Depends(get_current_active_user)
+    auth: AuthContext = Depends(get_auth_context)
 ):
     """
     Lấy danh sách members theo workspace_id và user_id từ JWT token
@@ -86,31 +60,10 @@ async def list_members(
     JWT token sẽ tự động cung cấp: workspace_id, user_id
     """
     try:
-        # Lấy thông tin từ JWT token đã được parse
-        token_data = current_user.get("token_data", {})
-        user_data = current_user.get("user", {})
-        
-        # Extract thông tin cần thiết từ JWT
-        user_id = token_data.get("user_id") or user_data.get("id")
-        workspace_id = token_data.get("workspace_id")
-        
-        logger.info(f"DEBUG - JWT Token data: {token_data}")
-        logger.info(f"DEBUG - Extracted - workspace_id: '{workspace_id}', user_id: '{user_id}'")
+        # user_id/workspace_id đã được get_auth_context validate
+        user_id, workspace_id = auth.user_id, auth.workspace_id
         
-        # Validation các thông tin bắt buộc từ JWT
-        if not user_id:
-            logger.error("User ID not found in JWT token")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User ID not found in token"
-            )
-        
-        if not workspace_id:
-            logger.error("Workspace ID not found in JWT token")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Workspace ID not found in token"
-            )
+        logger.debug("DEBUG - Extracted - workspace_id: '%s', user_id: '%s'", workspace_id, user_id)
         
         # Gọi service để lấy danh sách members
         logger.info(f"Listing members for workspace: {workspace_id}, user: {user_id}")
@@ -135,7 +88,7 @@ async def list_members(
 async def update_member(
     member_id: str,
     request: UpdateMemberRequest,
-    current_user: dict = Depends(get_current_active_user)
+    auth: AuthContext = Depends(get_auth_context)
 ):
     """
     Update member theo workspace_id, user_id, member_id
@@ -148,31 +101,10 @@ async def update_member(
     JWT token sẽ tự động cung cấp: workspace_id, user_id
     """
     try:
-        # Lấy thông tin từ JWT token đã được parse
-        token_data = current_user.get("token_data", {})
-        user_data = current_user.get("user", {})
-        
-        # Extract thông tin cần thiết từ JWT
-        user_id = token_data.get("user_id") or user_data.get("id")
-        workspace_id = token_data.get("workspace_id")
+        # user_id/workspace_id đã được get_auth_context validate
+        user_id, workspace_id = auth.user_id, auth.workspace_id
         
-        logger.info(f"DEBUG - JWT Token data: {token_data}")
-        logger.info(f"DEBUG - Extracted - workspace_id: '{workspace_id}', user_id: '{user_id}', member_id: '{member_id}'")
-        
-        # Validation các thông tin bắt buộc từ JWT
-        if not user_id:
-            logger.error("User ID not found in JWT token")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User ID not found in token"
-            )
-        
-        if not workspace_id:
-            logger.error("Workspace ID not found in JWT token")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Workspace ID not found in token"
-            )
+        logger.debug("DEBUG - Extracted - workspace_id: '%s', user_id: '%s', member_id: '%s'", workspace_id, user_id, member_id)
         
         # Validation member_id
         if not member_id or member_id.strip() == "":
@@ -0,0 +1,43 @@
+from typing import Any, ClassVar, Dict, FrozenSet, Optional
+from pydantic import BaseModel, ConfigDict
+
+class BaseSchema(BaseModel):
+    """Base chung cho member/session schema
+
+    defer_build: core schema chỉ build khi model được dùng lần đầu, không build lúc import.
+    Model gắn vào route vẫn được FastAPI build khi đăng ký route, nên request đầu không chịu chi phí này.
+    """
+    model_config = ConfigDict(defer_build=True)
+
+class ResponseSchema(BaseSchema):
+    """Base cho response model: dựng một lần rồi serialize, không sửa sau khi tạo"""
+    model_config = ConfigDict(frozen=True)
+
+class TrustedModel(ResponseSchema):
+    """Base cho response model dựng từ dữ liệu đã lưu trong DB"""
+
+    # Tên các field, tính một lần cho mỗi class; None nếu class cần model_post_init
+    _field_names: ClassVar[Optional[FrozenSet[str]]] = None
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs: Any) -> None:
+        super().__pydantic_init_subclass__(**kwargs)
+        cls._field_names = None if cls.__pydantic_post_init__ else frozenset(cls.model_fields)
+
+    @classmethod
+    def from_trusted(cls, data: Dict[str, Any]):
+        """Tạo instance không qua validate (dữ liệu từ DB, không phải input của client).
+
+        data thuộc về instance sau khi gọi, caller không dùng lại dict này.
+        FastAPI vẫn validate response theo response_model trước khi trả về.
+        """
+        if data.keys() == cls._field_names:
+            # Row có đủ mọi field: gán thẳng như bước cuối của model_construct,
+            # bỏ vòng lặp qua model_fields để tìm alias/default cho từng row
+            m = cls.__new__(cls)
+            object.__setattr__(m, '__dict__', data)
+            object.__setattr__(m, '__pydantic_fields_set__', set(data))
+            object.__setattr__(m, '__pydantic_extra__', None)
+            object.__setattr__(m, '__pydantic_private__', None)
+            return m
+        return cls.model_construct(_fields_set=set(data), **data)
@@ -1,7 +1,23 @@
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, validator, field_validator, model_validator
 from typing import Optional
-from datetime import datetime
 from enum import Enum
+import re
+
+# Cùng tập chuỗi hợp lệ với datetime.strptime(v, '%d/%m/%Y') nhưng không qua _strptime/locale
+_DATE_DDMMYYYY = re.compile(r'(3[01]|[12]\d|0[1-9]|[1-9]| [1-9])/(1[0-2]|0[1-9]|[1-9])/(\d\d\d\d)')
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+def _is_valid_ddmmyyyy(v: str) -> bool:
+    """Kiểm tra ngày dạng dd/MM/yyyy (kể cả ngày có thật trong tháng)"""
+    match = _DATE_DDMMYYYY.fullmatch(v)
+    if match is None:
+        return False
+    day, month, year = int(match[1]), int(match[2]), int(match[3])
+    if year == 0:
+        return False
+    if month == 2 and day == 29:
+        return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+    return day <= _DAYS_IN_MONTH[month - 1]
 
 class PriorityEnum(str, Enum):
     HIGHEST = "Highest"
@@ -20,6 +36,28 @@ class TypeEnum(str, Enum):
     TASK = "Task"
     SUBTASK = "Sub_task"
 
+class ListTypeEnum(str, Enum):
+    EPIC = "Epic"
+    TASK = "Task"
+    SUBTASK = "Sub_task"
+    ALL = "All"
+
+# Field bắt buộc theo type của CreateTaskRequest: (field, thông báo lỗi)
+_REQUIRED_BY_TYPE = {
+    TypeEnum.EPIC: (
+        ("epic_name", "epic_name is required for Epic type"),
+    ),
+    TypeEnum.TASK: (
+        ("epic_id", "epic_id is required for Task and Sub_task types"),
+        ("task_name", "task_name is required for Task type"),
+    ),
+    TypeEnum.SUBTASK: (
+        ("epic_id", "epic_id is required for Task and Sub_task types"),
+        ("parent_id", "parent_id is required for Sub_task type"),
+        ("sub_task_name", "sub_task_name is required for Sub_task type"),
+    ),
+}
+
 class CreateTaskRequest(BaseModel):
     type: TypeEnum = Field(..., description="Loại task: Epic, Task, hoặc Sub_task")
     
@@ -43,44 +81,21 @@ class CreateTaskRequest(BaseModel):
     start_date: Optional[str] = Field(None, description="Ngày bắt đầu (dd/MM/yyyy)")
     due_date: Optional[str] = Field(None, description="Ngày kết thúc (dd/MM/yyyy)")
 
-    @validator('start_date', 'due_date')
+    @field_validator('start_date', 'due_date')
+    @classmethod
     def validate_date_format(cls, v):
-        if v is not None:
-            try:
-                datetime.strptime(v, '%d/%m/%Y')
-            except ValueError:
-                raise ValueError('Date must be in format dd/MM/yyyy')
-        return v
-    
-    @validator('epic_name')
-    def validate_epic_name(cls, v, values):
-        if values.get('type') == TypeEnum.EPIC and not v:
-            raise ValueError('epic_name is required for Epic type')
+        if v is not None and not _is_valid_ddmmyyyy(v):
+            raise ValueError('Date must be in format dd/MM/yyyy')
         return v
     
-    @validator('epic_id')
-    def validate_epic_id(cls, v, values):
-        if values.get('type') in [TypeEnum.TASK, TypeEnum.SUBTASK] and not v:
-            raise ValueError('epic_id is required for Task and Sub_task types')
-        return v
-    
-    @validator('task_name')
-    def validate_task_name(cls, v, values):
-        if values.get('type') == TypeEnum.TASK and not v:
-            raise ValueError('task_name is required for Task type')
-        return v
-    
-    @validator('parent_id')
-    def validate_parent_id(cls, v, values):
-        if values.get('type') == TypeEnum.SUBTASK and not v:
-            raise ValueError('parent_id is required for Sub_task type')
-        return v
-    
-    @validator('sub_task_name')
-    def validate_sub_task_name(cls, v, values):
-        if values.get('type') == TypeEnum.SUBTASK and not v:
-            raise ValueError('sub_task_name is required for Sub_task type')
-        return v
+    @model_validator(mode='after')
+    def validate_required_by_type(self):
+        # Giống các validator cũ theo từng field: chỉ báo lỗi khi field được gửi lên mà rỗng
+        fields_set = self.model_fields_set
+        for field, message in _REQUIRED_BY_TYPE.get(self.type, ()):
+            if field in fields_set and not getattr(self, field):
+                raise ValueError(message)
+        return self
 
 # Giữ lại cho backward compatibility
 class CreateEpicRequest(BaseModel):
@@ -95,11 +110,8 @@ class CreateEpicRequest(BaseModel):
 
     @validator('start_date', 'due_date')
     def validate_date_format(cls, v):
-        if v is not None:
-            try:
-                datetime.strptime(v, '%d/%m/%Y')
-            except ValueError:
-                raise ValueError('Date must be in format dd/MM/yyyy')
+        if v is not None and not _is_valid_ddmmyyyy(v):
+            raise ValueError('Date must be in format dd/MM/yyyy')
         return v
 
 class EpicResponse(BaseModel):
@@ -157,11 +169,8 @@ class UpdateTaskRequest(BaseModel):
     
     @validator('start_date', 'due_date', 'deadline_extend')
     def validate_date_format(cls, v):
-        if v is not None:
-            try:
-                datetime.strptime(v, '%d/%m/%Y')
-            except ValueError:
-                raise ValueError('Date must be in format dd/MM/yyyy')
+        if v is not None and not _is_valid_ddmmyyyy(v):
+            raise ValueError('Date must be in format dd/MM/yyyy')
         return v
 
 class UpdateTaskResponse(BaseModel):
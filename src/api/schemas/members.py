@@ -1,23 +1,72 @@
-from pydantic import BaseModel, Field
+from pydantic import ConfigDict, Field, field_validator
 from typing import Optional, List
-from datetime import datetime
+from src.api.schemas._base import BaseSchema, ResponseSchema, TrustedModel
 
-class CreateMemberRequest(BaseModel):
+# Ví dụ cho OpenAPI docs, dựng một lần ở module level
+_OWNER_EXAMPLE = {
+    "workspace_id": "default_workspace",
+    "user_id": "user_865417"
+}
+
+_CREATE_MEMBER_REQUEST_EXAMPLE = {
+    "member_name": "Nguyen Van A",
+    "team": "Development",
+    "email": "nguyenvana@example.com"
+}
+
+_CREATE_MEMBER_RESPONSE_EXAMPLE = {
+    **_OWNER_EXAMPLE,
+    "member_id": "a1b2c3d4e5f6g7h8i9j0k1l2m3n4o5p6",
+    **_CREATE_MEMBER_REQUEST_EXAMPLE,
+    "created_at": "24/09/2024 13:45:30",
+    "updated_at": None
+}
+
+_LIST_MEMBERS_EXAMPLE = {
+    "members": [
+        {
+            **_OWNER_EXAMPLE,
+            "member_id": "01",
+            "member_name": "Duc Nguyen",
+            "team": "Dev",
+            "email": "ducnguyen@example.com",
+            "created_at": "24/09/2024 02:39:32"
+        }
+    ],
+    "total": 1,
+    **_OWNER_EXAMPLE
+}
+
+_UPDATE_MEMBER_REQUEST_EXAMPLE = {
+    "member_name": "Nguyen Van B Updated",
+    "team": "Marketing",
+    "email": "nguyenvanb.updated@example.com"
+}
+
+_UPDATE_MEMBER_RESPONSE_EXAMPLE = {
+    **_OWNER_EXAMPLE,
+    "member_id": "01",
+    **_UPDATE_MEMBER_REQUEST_EXAMPLE,
+    "created_at": "24/09/2024 13:45:30",
+    "updated_at": "24/09/2024 15:20:15"
+}
+
+class CreateMemberRequest(BaseSchema):
     """Schema cho request tạo member mới"""
-    member_name: str = Field(..., description="Tên thành viên (bắt buộc)")
+    member_name: str = Field(..., min_length=1, description="Tên thành viên (bắt buộc)")
     team: Optional[str] = Field(None, description="Tên team (tùy chọn)")
     email: Optional[str] = Field(None, description="Email thành viên (tùy chọn)")
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "member_name": "Nguyen Van A",
-                "team": "Development",
-                "email": "nguyenvana@example.com"
-            }
-        }
+    @field_validator('member_name', mode='before')
+    @classmethod
+    def strip_member_name(cls, v):
+        # Strip trước để min_length chặn luôn tên chỉ có khoảng trắng
+        return v.strip() if isinstance(v, str) else v
+
+    # Body JSON đã là str/None, không cần coercion
+    model_config = ConfigDict(strict=True, json_schema_extra={"example": _CREATE_MEMBER_REQUEST_EXAMPLE})
 
-class CreateMemberResponse(BaseModel):
+class CreateMemberResponse(ResponseSchema):
     """Schema cho response sau khi tạo member thành công"""
     workspace_id: str
     user_id: str
@@ -28,21 +77,9 @@ class CreateMemberResponse(BaseModel):
     created_at: str
     updated_at: Optional[str]
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "workspace_id": "default_workspace",
-                "user_id": "user_865417",
-                "member_id": "a1b2c3d4e5f6g7h8i9j0k1l2m3n4o5p6",
-                "member_name": "Nguyen Van A",
-                "team": "Development",
-                "email": "nguyenvana@example.com",
-                "created_at": "24/09/2024 13:45:30",
-                "updated_at": None
-            }
-        }
+    model_config = ConfigDict(json_schema_extra={"example": _CREATE_MEMBER_RESPONSE_EXAMPLE})
 
-class MemberInfo(BaseModel):
+class MemberInfo(TrustedModel):
     """Schema cho thông tin member"""
     workspace_id: str
     user_id: str
@@ -52,49 +89,24 @@ class MemberInfo(BaseModel):
     email: Optional[str]
     created_at: str
 
-class ListMembersResponse(BaseModel):
+class ListMembersResponse(ResponseSchema):
     """Schema cho response danh sách members"""
     members: List[MemberInfo]
     total: int
     workspace_id: str
     user_id: str
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "members": [
-                    {
-                        "workspace_id": "default_workspace",
-                        "user_id": "user_865417",
-                        "member_id": "01",
-                        "member_name": "Duc Nguyen",
-                        "team": "Dev",
-                        "email": "ducnguyen@example.com",
-                        "created_at": "24/09/2024 02:39:32"
-                    }
-                ],
-                "total": 1,
-                "workspace_id": "default_workspace",
-                "user_id": "user_865417"
-            }
-        }
+    model_config = ConfigDict(json_schema_extra={"example": _LIST_MEMBERS_EXAMPLE})
 
-class UpdateMemberRequest(BaseModel):
+class UpdateMemberRequest(BaseSchema):
     """Schema cho request update member"""
     member_name: Optional[str] = Field(None, description="Tên thành viên mới (tùy chọn)")
     team: Optional[str] = Field(None, description="Tên team mới (tùy chọn)")
     email: Optional[str] = Field(None, description="Email mới (tùy chọn)")
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "member_name": "Nguyen Van B Updated",
-                "team": "Marketing",
-                "email": "nguyenvanb.updated@example.com"
-            }
-        }
+    model_config = ConfigDict(strict=True, json_schema_extra={"example": _UPDATE_MEMBER_REQUEST_EXAMPLE})
 
-class UpdateMemberResponse(BaseModel):
+class UpdateMemberResponse(ResponseSchema):
     """Schema cho response sau khi update member thành công"""
     workspace_id: str
     user_id: str
@@ -105,16 +117,4 @@ class UpdateMemberResponse(BaseModel):
     created_at: str
     updated_at: str
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "workspace_id": "default_workspace",
-                "user_id": "user_865417",
-                "member_id": "01",
-                "member_name": "Nguyen Van B Updated",
-                "team": "Marketing",
-                "email": "nguyenvanb.updated@example.com",
-                "created_at": "24/09/2024 13:45:30",
-                "updated_at": "24/09/2024 15:20:15"
-            }
-        }
+    model_config = ConfigDict(json_schema_extra={"example": _UPDATE_MEMBER_RESPONSE_EXAMPLE})
@@ -1,28 +1,33 @@
-from pydantic import BaseModel, Field
+from pydantic import ConfigDict, Field
 from typing import Optional, Dict, Any, List
 from datetime import datetime
+from src.api.schemas._base import BaseSchema, ResponseSchema, TrustedModel
 
-class CreateSessionRequest(BaseModel):
+class CreateSessionRequest(BaseSchema):
     """Request model for creating a new agent session"""
-    metadata: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Initial session metadata")
+    # Default None: pydantic deep-copy default không hash được cho mỗi request, None thì không
+    metadata: Optional[Dict[str, Any]] = Field(None, description="Initial session metadata")
 
-class CreateSessionResponse(BaseModel):
+    model_config = ConfigDict(strict=True)
+
+class CreateSessionResponse(ResponseSchema):
     """Response model for creating a new agent session"""
     session_id: str = Field(..., description="The created session ID")
     agent_id: str = Field(..., description="The ID of the agent the session is for")
     workspace_id: str = Field(..., description="The Id of workspace user created")
     created_at: str = Field(..., description="Timestamp when the session was created")
 
-class GetSessionResponse(BaseModel):
+class GetSessionResponse(ResponseSchema):
     """Response model for getting session details"""
     id: Optional[str] = Field(None, description="Session ID")
     app_name: Optional[str] = Field(None, description="Application name")
     user_id: Optional[str] = Field(None, description="User ID")
-    state: Dict[str, Any] = Field(default_factory=dict, description="Session state")
+    # Passthrough JSON từ DB: Any để response validation không duyệt từng key
+    state: Any = Field(default_factory=dict, description="Session state")
     create_time: Optional[str] = Field(None, description="Session creation timestamp")
     update_time: Optional[str] = Field(None, description="Session last update timestamp")
 
-class EventResponse(BaseModel):
+class EventResponse(TrustedModel):
     """Response model for session events"""
     id: str = Field(..., description="Event ID")
     app_name: str = Field(..., description="Application name")
@@ -31,33 +36,35 @@ class EventResponse(BaseModel):
     invocation_id: Optional[str] = Field(None, description="Invocation ID")
     author: str = Field(..., description="Event author")
     branch: Optional[str] = Field(None, description="Branch")
-    timestamp: str = Field(..., description="Event timestamp")
+    # Serialize ra ISO 8601 bởi pydantic-core, giống datetime.isoformat() với timestamp không timezone
+    timestamp: datetime = Field(..., description="Event timestamp")
     content: Optional[str] = Field(None, description="Event content")
     actions: Optional[List[Dict[str, Any]]] = Field(None, description="Event actions")
     long_running_tool_ids_json: Optional[str] = Field(None, description="Long running tool IDs")
-    grounding_metadata: Optional[Dict[str, Any]] = Field(None, description="Grounding metadata")
+    grounding_metadata: Any = Field(None, description="Grounding metadata")
     partial: Optional[bool] = Field(None, description="Is partial event")
     turn_complete: Optional[bool] = Field(None, description="Is turn complete")
     error_code: Optional[str] = Field(None, description="Error code")
     error_message: Optional[str] = Field(None, description="Error message")
     interrupted: Optional[bool] = Field(None, description="Is interrupted")
-    custom_metadata: Optional[Dict[str, Any]] = Field(None, description="Custom metadata")
+    # Passthrough JSON từ DB, không duyệt từng key khi validate response
+    custom_metadata: Any = Field(None, description="Custom metadata")
 
-class GetEventsResponse(BaseModel):
+class GetEventsResponse(ResponseSchema):
     """Response model for getting session events"""
     session_id: str = Field(..., description="Session ID")
     events: List[EventResponse] = Field(..., description="List of events")
     total_count: int = Field(..., description="Total number of events")
 
-class SessionSummary(BaseModel):
+class SessionSummary(TrustedModel):
     """Summary of a session for listing"""
     id: Optional[str] = Field(None, description="Session ID")
     app_name: Optional[str] = Field(None, description="Application name")
     user_id: Optional[str] = Field(None, description="User ID")
-    create_time: Optional[str] = Field(None, description="Session creation timestamp")
-    update_time: Optional[str] = Field(None, description="Session last update timestamp")
+    create_time: Optional[datetime] = Field(None, description="Session creation timestamp")
+    update_time: Optional[datetime] = Field(None, description="Session last update timestamp")
 
-class GetAgentSessionsResponse(BaseModel):
+class GetAgentSessionsResponse(ResponseSchema):
     """Response model for getting all sessions of an agent"""
     agent_id: str = Field(..., description="Agent ID")
     sessions: List[SessionSummary] = Field(..., description="List of sessions")
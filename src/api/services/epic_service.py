@@ -1,18 +1,54 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
+import asyncio
+import threading
 from datetime import datetime, timedelta
 import uuid
 import pytz
+from cachetools import TTLCache
 from fastapi import HTTPException
-from src.database.postgres import get_db_connection
+from src.database.postgres import get_db_connection, get_pool_for_current_loop
 from src.api.schemas.epics import CreateEpicRequest, CreateTaskRequest, DeleteTaskResponse, GetTaskResponse, UpdateTaskRequest, UpdateTaskResponse, EpicResponse, PriorityEnum, StatusEnum, TypeEnum
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Cache kết quả đọc (list/get) trong 30s, key = (kind, workspace_id, user_id, ...).
+# Dùng chung cho mọi EpicService instance: router dùng singleton epic_service, còn agent tool
+# tự tạo instance và có thể ghi từ thread khác (asyncio.run), nên mọi truy cập đi qua lock
+_read_cache = TTLCache(maxsize=2048, ttl=30)
+# Đếm số lần ghi theo workspace, để bỏ qua kết quả đọc bắt đầu trước một lần ghi
+_write_generation: Dict[str, int] = {}
+_read_cache_lock = threading.Lock()
+
 class EpicService:
     def __init__(self):
         self.vietnam_tz = pytz.timezone('Asia/Ho_Chi_Minh')  # UTC+7
+        # Các query list đang chạy, key = (workspace_id, user_id, type_filter),
+        # value = (future, write generation của workspace lúc query bắt đầu)
+        self._pending_lists: Dict[tuple, Tuple[asyncio.Future, int]] = {}
     
+    def _invalidate_reads(self, workspace_id: str) -> None:
+        """Xóa cache đọc của workspace sau khi tạo/sửa/xóa item (áp dụng cho mọi instance)"""
+        with _read_cache_lock:
+            _write_generation[workspace_id] = _write_generation.get(workspace_id, 0) + 1
+            for key in [k for k in _read_cache if k[1] == workspace_id]:
+                _read_cache.pop(key, None)
+
+    async def _cached_read(self, key: tuple, loader):
+        """Trả kết quả từ cache nếu có, ngược lại chạy loader() và lưu lại khi không có ghi xen giữa"""
+        workspace_id = key[1]
+        with _read_cache_lock:
+            try:
+                return _read_cache[key]
+            except KeyError:
+                pass
+            generation = _write_generation.get(workspace_id, 0)
+        result = await loader()
+        with _read_cache_lock:
+            if _write_generation.get(workspace_id, 0) == generation:
+                _read_cache[key] = result
+        return result
+
     def generate_epic_id(self) -> str:
         """Tạo epic ID theo format: epic-[32 ký tự]"""
         random_string = str(uuid.uuid4()).replace('-', '')
@@ -228,6 +264,7 @@ class EpicService:
             )
             
             logger.info(f"Epic created successfully: {epic_id}")
+            self._invalidate_reads(workspace_id)
             
             # 8. Trả về EpicResponse
             return EpicResponse(
@@ -270,41 +307,6 @@ class EpicService:
         conn = None
         try:
             conn = await get_db_connection()
-            # Debug: Đầu tiên kiểm tra tất cả records trong table
-            debug_query = """
-                SELECT COUNT(*) as total_records, 
-                       COUNT(CASE WHEN TRIM(type) = 'Epic' THEN 1 END) as epic_records
-                FROM ai_proma.task_info
-            """
-            debug_result = await conn.fetchrow(debug_query)
-            logger.info(f"DEBUG - Total records: {debug_result['total_records']}, Epic records: {debug_result['epic_records']}")
-            
-            # Debug: Kiểm tra các type values có trong DB
-            type_query = """
-                SELECT DISTINCT TRIM(type) as type_trimmed, type as type_raw, COUNT(*) as count
-                FROM ai_proma.task_info 
-                GROUP BY type
-            """
-            type_results = await conn.fetch(type_query)
-            logger.info(f"DEBUG - Type distribution: {[(row['type_trimmed'], row['type_raw'][:10] + '...', row['count']) for row in type_results]}")
-            
-            # Debug: Kiểm tra workspace_id distribution
-            workspace_query = """
-                SELECT DISTINCT TRIM(workspace_id) as workspace_trimmed, COUNT(*) as count
-                FROM ai_proma.task_info 
-                GROUP BY workspace_id
-            """
-            workspace_results = await conn.fetch(workspace_query)
-            logger.info(f"DEBUG - Workspace distribution: {[(row['workspace_trimmed'], row['count']) for row in workspace_results]}")
-            
-            # Debug: Lấy 5 records đầu tiên để xem structure
-            sample_query = """
-                SELECT workspace_id, type, epic_name
-                FROM ai_proma.task_info 
-                LIMIT 5
-            """
-            sample_results = await conn.fetch(sample_query)
-            logger.info(f"DEBUG - Sample records: {[dict(row) for row in sample_results]}")
             
             # Main query - sử dụng TRIM để loại bỏ trailing spaces
             base_query = """
@@ -363,28 +365,6 @@ class EpicService:
             results = await conn.fetch(query_with_placeholders, *param_values)
             logger.info(f"DEBUG - Raw query returned {len(results)} rows")
             
-            # Nếu không có results, thử query không có filters
-            if len(results) == 0:
-                logger.info("DEBUG - No results with filters, trying without filters...")
-                simple_query = """
-                    SELECT COUNT(*) as count, 
-                           MIN(type) as sample_type,
-                           MIN(workspace_id) as sample_workspace
-                    FROM ai_proma.task_info 
-                    WHERE TRIM(type) = 'Epic'
-                """
-                simple_result = await conn.fetchrow(simple_query)
-                logger.info(f"DEBUG - Simple epic count: {simple_result}")
-                
-                # Thử lấy tất cả records để debug
-                all_query = """
-                    SELECT workspace_id, type, epic_name
-                    FROM ai_proma.task_info 
-                    LIMIT 10
-                """
-                all_results = await conn.fetch(all_query)
-                logger.info(f"DEBUG - All records sample: {[dict(row) for row in all_results]}")
-            
             # Convert results thành EpicResponse objects
             epics = []
             for row in results:
@@ -659,6 +639,7 @@ class EpicService:
             )
             
             logger.info(f"Epic created successfully: {epic_id}")
+            self._invalidate_reads(workspace_id)
             
             # 8. Trả về EpicResponse (không có agent_id)
             return EpicResponse(
@@ -783,9 +764,13 @@ class EpicService:
             user_id: ID của user
             type_filter: "Epic", "Task", "Sub_task", hoặc "All"
         """
+        pool = None
         conn = None
         try:
-            conn = await get_db_connection()
+            # Shared pool khi chạy trên event loop của app; agent tool chạy asyncio.run()
+            # trên thread riêng nên mở connection trực tiếp như trước
+            pool = get_pool_for_current_loop()
+            conn = await pool.acquire() if pool else await get_db_connection()
             logger.info(f"Listing {type_filter} - workspace: '{workspace_id}', user: '{user_id}'")
             
             # Build WHERE clause dựa trên type_filter
@@ -870,7 +855,49 @@ class EpicService:
             raise Exception(f"Failed to list tasks by type: {str(e)}")
         finally:
             if conn:
-                await conn.close()
+                if pool:
+                    await pool.release(conn)
+                else:
+                    await conn.close()
+
+    async def load_tasks_by_type(self, workspace_id: str, user_id: str, type_filter: str) -> list[EpicResponse]:
+        """
+        Giống list_tasks_by_type nhưng dùng cache đọc 30s và gộp các request giống nhau
+        đang chạy đồng thời (cùng workspace_id, user_id, type_filter) thành một query duy nhất
+        """
+        key = (workspace_id, user_id, type_filter)
+        with _read_cache_lock:
+            generation = _write_generation.get(workspace_id, 0)
+        entry = self._pending_lists.get(key)
+        # Query đang chạy bắt đầu trước một lần ghi thì không gộp vào, tránh trả dữ liệu cũ
+        if entry is not None and entry[1] == generation:
+            pending = entry[0]
+        else:
+            pending = asyncio.ensure_future(self._cached_read(
+                ("list", workspace_id, user_id, type_filter),
+                lambda: self.list_tasks_by_type(workspace_id, user_id, type_filter)
+            ))
+            self._pending_lists[key] = (pending, generation)
+            pending.add_done_callback(lambda fut: self._on_list_done(key, fut))
+        # shield: một client ngắt kết nối không làm hủy query của các client khác
+        return await asyncio.shield(pending)
+
+    def _on_list_done(self, key: tuple, fut: asyncio.Future) -> None:
+        """Bỏ query đã xong khỏi _pending_lists (nếu chưa bị query mới thay thế)"""
+        entry = self._pending_lists.get(key)
+        if entry is not None and entry[0] is fut:
+            del self._pending_lists[key]
+        # Lấy exception để asyncio không log "Future exception was never retrieved"
+        # khi mọi request chờ query này đều đã bị hủy
+        if not fut.cancelled():
+            fut.exception()
+
+    async def load_task_by_id(self, item_id: str, workspace_id: str, user_id: str) -> GetTaskResponse:
+        """Giống get_task_by_id_cascade nhưng dùng cache đọc 30s"""
+        return await self._cached_read(
+            ("get", workspace_id, user_id, item_id),
+            lambda: self.get_task_by_id_cascade(item_id=item_id, workspace_id=workspace_id, user_id=user_id)
+        )
 
     async def list_tasks_by_time_period(
         self,
@@ -1118,6 +1145,7 @@ class EpicService:
             )
             
             logger.info(f"{request.type.value} created successfully: {item_id}")
+            self._invalidate_reads(workspace_id)
             
             # 7. Trả về EpicResponse
             return EpicResponse(
@@ -1238,6 +1266,8 @@ class EpicService:
                     results = await conn.fetch(query, *query_params)
             
             logger.info(f"Query returned {len(results)} affected rows")
+            if results and not dry_run:
+                self._invalidate_reads(workspace_id)
             
             # 4. Process results
             deleted_count = {"epic": 0, "task": 0, "subtask": 0}
@@ -1313,13 +1343,16 @@ class EpicService:
         Returns:
             GetTaskResponse với item chính + related items
         """
+        pool = None
         conn = None
         try:
             # 1. Detect type từ ID prefix
             item_type = self.detect_type_from_id(item_id)
             logger.info(f"Detected type: {item_type} for item_id: {item_id}")
             
-            conn = await get_db_connection()
+            # Shared pool khi chạy trên event loop của app, ngược lại mở connection trực tiếp
+            pool = get_pool_for_current_loop()
+            conn = await pool.acquire() if pool else await get_db_connection()
             
             # 2. Build cascade query dựa trên type
             if item_type == "Epic":
@@ -1479,7 +1512,10 @@ class EpicService:
             raise Exception(f"Failed to get task cascade: {str(e)}")
         finally:
             if conn:
-                await conn.close()
+                if pool:
+                    await pool.release(conn)
+                else:
+                    await conn.close()
 
     async def update_task_by_type(
         self,
@@ -1638,6 +1674,7 @@ class EpicService:
                     status_code=404,
                     detail=f"{item_type} {item_id} not found or not owned by user"
                 )
+            self._invalidate_reads(workspace_id)
             
             # 9. Convert result to EpicResponse
             updated_item = EpicResponse(
@@ -68,16 +68,8 @@ class MemberService:
             logger.info(f"Member created successfully: {member_id}")
             
             # 5. Trả về CreateMemberResponse
-            return CreateMemberResponse(
-                workspace_id=member_data["workspace_id"],
-                user_id=member_data["user_id"],
-                member_id=member_data["member_id"],
-                member_name=member_data["member_name"],
-                team=member_data["team"],
-                email=member_data["email"],
-                created_at=member_data["created_at"],
-                updated_at=member_data["updated_at"]
-            )
+            # member_data có đúng 8 field của response, giá trị đã validate từ request hoặc tự sinh
+            return CreateMemberResponse.model_construct(**member_data)
             
         except Exception as e:
             logger.error(f"Error creating member: {e}")
@@ -99,7 +91,7 @@ class MemberService:
         try:
             conn = await get_db_connection()
             query = """
-                SELECT workspace_id, user_id, member_id, member_name, team, email, created_at
+                SELECT member_id, member_name, team, email, created_at
                 FROM ai_proma.team_info 
                 WHERE workspace_id = $1 AND user_id = $2
                 ORDER BY created_at DESC
@@ -109,21 +101,15 @@ class MemberService:
             logger.info(f"Found {len(results)} members")
             
             # Convert results thành MemberInfo objects
-            members = []
-            for row in results:
-                member_info = MemberInfo(
-                    workspace_id=row["workspace_id"],
-                    user_id=row["user_id"],
-                    member_id=row["member_id"],
-                    member_name=row["member_name"],
-                    team=row["team"],
-                    email=row["email"],
-                    created_at=row["created_at"]
-                )
-                members.append(member_info)
+            # workspace_id/user_id của mọi row bằng đúng tham số WHERE: không select lại,
+            # mọi row dùng chung hai object str này. Dữ liệu từ DB nên không cần validate lại
+            members = [
+                MemberInfo.from_trusted({"workspace_id": workspace_id, "user_id": user_id, **row})
+                for row in results
+            ]
             
             # Trả về ListMembersResponse
-            return ListMembersResponse(
+            return ListMembersResponse.model_construct(
                 members=members,
                 total=len(members),
                 workspace_id=workspace_id,
@@ -21,7 +21,10 @@ class CustomDatabaseArtifactService(BaseArtifactService):
     - Each session can contain multiple artifacts
     """
 
-    def __init__(self, db_url: str, user_id: str = None, workspace_id: str = None, agent_id: str = None, session_id: str = None):
+    # Tables/indexes only need checking once per process, not once per instance
+    _tables_initialized = False
+
+    def __init__(self, db_url: str, user_id: str = None, workspace_id: str = None, agent_id: str = None, session_id: str = None, pool: Optional[asyncpg.Pool] = None):
         """Initialize the custom database artifact service.
         
         Args:
@@ -30,8 +33,10 @@ class CustomDatabaseArtifactService(BaseArtifactService):
             workspace_id: Workspace ID for the current context.
             agent_id: Agent ID for the current context.
             session_id: Session ID for the current context.
+            pool: Shared asyncpg pool; when given, connections are borrowed from it instead of opened per call.
         """
         self.db_url = db_url
+        self.pool = pool
         self.user_id = user_id
         self.workspace_id = workspace_id
         self.agent_id = agent_id
@@ -43,14 +48,22 @@ class CustomDatabaseArtifactService(BaseArtifactService):
         logger.info(f"CustomDatabaseArtifactService initialized - User: {user_id}, Workspace: {workspace_id}, Agent: {agent_id}, Session: {session_id}")
 
     async def _get_connection(self) -> asyncpg.Connection:
+        if self.pool is not None:
+            return await self.pool.acquire()
         return await asyncpg.connect(self.db_url)
 
+    async def _release_connection(self, conn: asyncpg.Connection) -> None:
+        if self.pool is not None:
+            await self.pool.release(conn)
+        else:
+            await conn.close()
+
     async def _ensure_tables_exist(self) -> None:
-        if self._initialized:
+        if self._initialized or CustomDatabaseArtifactService._tables_initialized:
             return
             
         async with self._init_lock:
-            if self._initialized:
+            if self._initialized or CustomDatabaseArtifactService._tables_initialized:
                 return
                 
             conn = await self._get_connection()
@@ -93,9 +106,10 @@ class CustomDatabaseArtifactService(BaseArtifactService):
                 """)
                 
                 self._initialized = True
+                CustomDatabaseArtifactService._tables_initialized = True
                 
             finally:
-                await conn.close()
+                await self._release_connection(conn)
 
     async def _get_session_metadata(self, app_name: str, user_id: str, session_id: str) -> tuple[str, str]:
         """Get workspace_id and agent_id from session metadata.
@@ -130,7 +144,7 @@ class CustomDatabaseArtifactService(BaseArtifactService):
             return workspace_id, agent_id
             
         finally:
-            await conn.close()
+            await self._release_connection(conn)
 
     async def save_artifact(
         self,
@@ -225,7 +239,7 @@ class CustomDatabaseArtifactService(BaseArtifactService):
             logger.error(f"Failed to save artifact {filename} by agent {agent_id}: {str(e)}")
             raise
         finally:
-            await conn.close()
+            await self._release_connection(conn)
 
     async def load_artifact(
         self,
@@ -303,7 +317,7 @@ class CustomDatabaseArtifactService(BaseArtifactService):
             logger.error(f"Failed to load artifact {filename} by agent {agent_id}: {str(e)}")
             raise
         finally:
-            await conn.close()
+            await self._release_connection(conn)
 
     async def list_artifact_keys(
         self, *, app_name: str, user_id: str, session_id: str
@@ -336,7 +350,7 @@ class CustomDatabaseArtifactService(BaseArtifactService):
             return [row['filename'] for row in results]
             
         finally:
-            await conn.close()
+            await self._release_connection(conn)
 
     async def delete_artifact(
         self, *, app_name: str, user_id: str, session_id: str, filename: str
@@ -366,7 +380,7 @@ class CustomDatabaseArtifactService(BaseArtifactService):
             await conn.execute(query, actual_user_id, workspace_id, agent_id, app_name, actual_session_id, filename)
             
         finally:
-            await conn.close()
+            await self._release_connection(conn)
 
     async def list_versions(
         self, *, app_name: str, user_id: str, session_id: str, filename: str
@@ -399,7 +413,7 @@ class CustomDatabaseArtifactService(BaseArtifactService):
             return [row['version'] for row in results]
             
         finally:
-            await conn.close()
+            await self._release_connection(conn)
 
     # Core methods for getting artifacts by workspace
     
@@ -463,7 +477,7 @@ class CustomDatabaseArtifactService(BaseArtifactService):
             logger.error(f"Failed to list artifacts for user {user_id} in workspace {workspace_id} - Error: {str(e)}")
             raise
         finally:
-            await conn.close()
+            await self._release_connection(conn)
 
     async def log_artifact_activity_summary(self) -> None:
         """Log a summary of recent artifact activities for monitoring."""
@@ -504,4 +518,4 @@ class CustomDatabaseArtifactService(BaseArtifactService):
         except Exception as e:
             logger.error(f"Failed to generate activity summary - Error: {str(e)}")
         finally:
-            await conn.close()
+            await self._release_connection(conn)
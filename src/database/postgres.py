@@ -2,17 +2,73 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.sql import func
+import asyncio
 import asyncpg
+from typing import Optional
 from configs import get_database_url
 
 # Use centralized configuration for database URL
 DATABASE_URL = get_database_url()
 
+# Shared asyncpg pool, created lazily on first use (or at app startup)
+_pool = None
+_pool_loop = None
+_pool_lock = asyncio.Lock()
+
 # Direct connection helper (no pool)
 async def get_db_connection():
     """Create a new database connection each time"""
     return await asyncpg.connect(DATABASE_URL)
 
+async def get_pool() -> asyncpg.Pool:
+    """Get the shared connection pool, creating it on first call.
+
+    Connections keep asyncpg's prepared statement cache, so hot queries
+    are parsed once per connection instead of once per request.
+    """
+    global _pool, _pool_loop
+    if _pool is None:
+        # Lock so concurrent first requests don't each create a pool
+        async with _pool_lock:
+            if _pool is None:
+                _pool = await asyncpg.create_pool(
+                    DATABASE_URL,
+                    min_size=4,
+                    max_size=32,
+                    statement_cache_size=256
+                )
+                _pool_loop = asyncio.get_running_loop()
+    return _pool
+
+def get_pool_for_current_loop() -> Optional[asyncpg.Pool]:
+    """Return the shared pool if it belongs to the running event loop, else None.
+
+    asyncpg connections are bound to the loop that created the pool. Agent tools
+    run their coroutines with asyncio.run() on worker threads, so there the caller
+    must open its own connection with get_db_connection().
+    """
+    if _pool is not None and asyncio.get_running_loop() is _pool_loop:
+        return _pool
+    return None
+
+async def close_pool():
+    """Close the shared pool on shutdown"""
+    global _pool, _pool_loop
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+        _pool_loop = None
+
+# SQLAlchemy engine options for ADK's DatabaseSessionService (passed through to create_engine).
+# pool_pre_ping drops dead connections before use; pool_recycle stays under server idle timeouts.
+SESSION_ENGINE_KWARGS = {
+    "pool_size": 5,
+    "max_overflow": 10,
+    "pool_timeout": 30,
+    "pool_recycle": 1800,
+    "pool_pre_ping": True,
+}
+
 engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
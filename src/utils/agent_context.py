@@ -0,0 +1,7 @@
+from contextvars import ContextVar
+from typing import Optional
+
+# Per-request context for agent tools (workspace_id, user_id, user_name, session_id, agent_id).
+# Set by the chat endpoints; each asyncio task sees its own copy, so concurrent requests
+# served by the same thread never overwrite each other.
+AGENT_CONTEXT: ContextVar[Optional[dict]] = ContextVar("agent_context", default=None)
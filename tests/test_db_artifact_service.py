@@ -0,0 +1,33 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from src.custom.db_artifact_service import CustomDatabaseArtifactService
+
+
+class ReleaseConnectionTest(unittest.IsolatedAsyncioTestCase):
+    """_release_connection trả connection về pool, hoặc đóng nếu không có pool"""
+
+    async def test_without_pool_closes_connection(self):
+        service = CustomDatabaseArtifactService(db_url="postgresql://unused")
+        conn = MagicMock()
+        conn.close = AsyncMock()
+
+        await service._release_connection(conn)
+
+        conn.close.assert_awaited_once()
+
+    async def test_with_pool_releases_to_pool(self):
+        pool = MagicMock()
+        pool.release = AsyncMock()
+        service = CustomDatabaseArtifactService(db_url="postgresql://unused", pool=pool)
+        conn = MagicMock()
+        conn.close = AsyncMock()
+
+        await service._release_connection(conn)
+
+        pool.release.assert_awaited_once_with(conn)
+        conn.close.assert_not_awaited()
+
+
+if __name__ == "__main__":
+    unittest.main()
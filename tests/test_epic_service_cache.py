@@ -0,0 +1,89 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock
+
+from src.api.services.epic_service import EpicService, epic_service
+
+
+class ReadCacheTest(unittest.IsolatedAsyncioTestCase):
+    """Cache đọc dùng chung giữa singleton epic_service và các EpicService do agent tool tạo"""
+
+    async def test_write_through_other_instance_invalidates_singleton_read(self):
+        key = ("list", "ws-cache-test", "user-1", "Epic")
+        first = AsyncMock(return_value=["before"])
+        second = AsyncMock(return_value=["after"])
+
+        self.assertEqual(await epic_service._cached_read(key, first), ["before"])
+        # Lần đọc thứ hai lấy từ cache, không query lại
+        self.assertEqual(await epic_service._cached_read(key, second), ["before"])
+        second.assert_not_awaited()
+
+        # Agent tool ghi qua instance riêng
+        EpicService()._invalidate_reads("ws-cache-test")
+
+        self.assertEqual(await epic_service._cached_read(key, second), ["after"])
+        second.assert_awaited_once()
+
+    async def test_write_on_other_workspace_keeps_cache(self):
+        key = ("get", "ws-cache-keep", "user-1", "epic-1")
+        first = AsyncMock(return_value="cached")
+        second = AsyncMock(return_value="fresh")
+
+        await epic_service._cached_read(key, first)
+        EpicService()._invalidate_reads("ws-cache-other")
+
+        self.assertEqual(await epic_service._cached_read(key, second), "cached")
+        second.assert_not_awaited()
+
+
+class CoalesceListTest(unittest.IsolatedAsyncioTestCase):
+    """load_tasks_by_type gộp các request list đồng thời nhưng không gộp qua một lần ghi"""
+
+    async def test_does_not_join_query_started_before_write(self):
+        service = EpicService()
+        release = asyncio.Event()
+        calls = []
+
+        async def slow_list(workspace_id, user_id, type_filter):
+            # Kết quả theo thứ tự query được chạy, không theo thứ tự hoàn thành
+            result = ["before"] if not calls else ["after"]
+            calls.append(result)
+            await release.wait()
+            return result
+
+        service.list_tasks_by_type = slow_list
+        async def wait_for_calls(n):
+            while len(calls) < n:
+                await asyncio.sleep(0)
+
+        first = asyncio.ensure_future(service.load_tasks_by_type("ws-coalesce", "user-1", "Epic"))
+        await asyncio.wait_for(wait_for_calls(1), timeout=1)
+
+        service._invalidate_reads("ws-coalesce")
+        second = asyncio.ensure_future(service.load_tasks_by_type("ws-coalesce", "user-1", "Epic"))
+        # Request sau lần ghi phải chạy query mới thay vì gộp vào query cũ
+        try:
+            await asyncio.wait_for(wait_for_calls(2), timeout=1)
+        finally:
+            release.set()
+
+        self.assertEqual(await first, ["before"])
+        self.assertEqual(await second, ["after"])
+        self.assertEqual(service._pending_lists, {})
+
+    async def test_concurrent_requests_share_one_query(self):
+        service = EpicService()
+        list_mock = AsyncMock(return_value=["row"])
+        service.list_tasks_by_type = list_mock
+
+        results = await asyncio.gather(
+            service.load_tasks_by_type("ws-coalesce-share", "user-1", "Task"),
+            service.load_tasks_by_type("ws-coalesce-share", "user-1", "Task"),
+        )
+
+        self.assertEqual(results, [["row"], ["row"]])
+        list_mock.assert_awaited_once()
+
+
+if __name__ == "__main__":
+    unittest.main()